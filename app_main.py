@@ -1,13 +1,9 @@
 import streamlit as st
 from PIL import Image
 import pandas as pd
-from operacoes.app_estrategia_deploy import detalhe_deploy
-from operacoes.app_modelo_previsao import modelo_de_previsao
-from operacoes.app_visao_geral import visao_geral
-from operacoes.carregar_tabela import carregar_base_dados
-from operacoes.utils import style
-from operacoes.app_detalhe_previsao import detalhe_previsao
-from operacoes.app_analise_historica import analises_historicas
+from operacoes.servico_dados import obter_servico_dados, mostrar_status_dados
+# Páginas importadas só quando abertas (custo de cada uma: python -m operacoes.tempo_importacao)
+from operacoes.paginas import PAGINAS, carregar_pagina
 
 
 st.set_page_config(
@@ -16,7 +12,7 @@ st.set_page_config(
     menu_items={"About": "Desenvolvido por Carlos Silva"},
 )
 
-# style()
+# style()  # de operacoes.utils (importa o scikit-learn)
 
 img = Image.open("imagens/tx1.png")
 
@@ -36,13 +32,7 @@ st.sidebar.image(img_resized)
 
 st.sidebar.markdown("## **MENU NAVEGAÇÃO**")
 
-menu = [
-    "🏠 Visão Geral",
-    "📊 Análises Históricas",
-    "🤖 Informações do Modelo",
-    "📈 Resultados e Predições",
-    "🚀 Estratégia de Deploy",
-]
+menu = list(PAGINAS)
 choice = st.sidebar.selectbox("", menu)
 
 st.sidebar.markdown("---")
@@ -50,24 +40,23 @@ st.sidebar.image("imagens/rb_50948.png")
 
 
 # Menu de navegação
-if choice == "🏠 Visão Geral":
-    visao_geral()
+pagina = carregar_pagina(choice)
 
-elif choice == "📊 Análises Históricas":
-    df = carregar_base_dados()
+if choice == "📊 Análises Históricas":
+    # Última versão válida dos dados, sem esperar pelo IPEA (atualização em segundo plano)
+    df = obter_servico_dados().obter()
     # df = pd.read_csv("dados/dados_petroleo_brent_2005_2025.csv")
-    analises_historicas(df)
+    if df is None:
+        st.error("❌ Não foi possível carregar os dados do IPEA nem encontrar a base local.")
+    else:
+        # O DataFrame é compartilhado entre as sessões; a página só o lê (os agregados ficam à parte)
+        pagina(df)
 
-elif choice == "🤖 Informações do Modelo":
-    detalhe_previsao()
-
-elif choice == "📈 Resultados e Predições":
-    modelo_de_previsao()
-
-elif choice == "🚀 Estratégia de Deploy":
-    detalhe_deploy()
+else:
+    pagina()
 
 
 st.sidebar.markdown("---")
+mostrar_status_dados()
 st.sidebar.markdown("**Desenvolvido por Carlos Pereira Silva**")
 
@@ -0,0 +1,91 @@
+"""
+Agregados da série do Brent usados pela página de análises históricas, calculados uma única vez por
+versão dos dados (armazenamento.versao_dados) e compartilhados por todas as sessões do processo.
+
+- "diario": preço e variação percentual diária;
+- "mensal" e "anual": preço médio, mínimo, máximo e desvio padrão de cada mês e de cada ano;
+- "eventos": recorte da série na janela de cada evento de EVENTOS.
+
+Os DataFrames são somente leitura: quem precisar alterar um deles deve trabalhar em uma cópia. O
+DataFrame recebido também nunca é alterado (as colunas derivadas ficam nos agregados).
+"""
+import threading
+import pandas as pd
+from operacoes import cache_figuras
+from operacoes.armazenamento import versao_dados
+
+# Janelas (inicio, fim) dos eventos destacados nas análises
+EVENTOS = {
+    "crise_2008": ("2007-01-01", "2009-12-31"),
+    "covid_19": ("2019-07-01", "2021-06-30"),
+    "guerra_ucrania": ("2021-08-01", "2023-02-28"),
+}
+
+# Versões dos dados mantidas em memória (a atual e as anteriores ainda em uso por alguma sessão)
+MAXIMO_VERSOES = 3
+
+_agregados = {}  # versao_dados -> agregados
+_trava = threading.Lock()
+
+
+def _resumo(df, periodo):
+    """Preço médio, mínimo, máximo e desvio padrão por período ("M" para mês, "Y" para ano)."""
+    grupos = df.groupby(df["Data"].dt.to_period(periodo))["Preço (US$)"]
+    resumo = grupos.agg(["mean", "min", "max", "std"]).rename(
+        columns={
+            "mean": "Preço Médio (US$)",
+            "min": "Preço Mínimo (US$)",
+            "max": "Preço Máximo (US$)",
+            "std": "Desvio Padrão (US$)",
+        }
+    )
+    resumo.index.name = "Período"
+    return resumo.reset_index()
+
+
+def calcular_agregados(df):
+    """
+    Agregados de uma série ("Data", "Preço (US$)"), sem alterar o DataFrame recebido.
+    :return: Dicionário com "diario", "mensal", "anual" e "eventos" ({nome: DataFrame}).
+    """
+    diario = df[["Data", "Preço (US$)"]].sort_values("Data").reset_index(drop=True)
+    diario["Data"] = pd.to_datetime(diario["Data"])
+    diario["Variação (%)"] = diario["Preço (US$)"].pct_change() * 100
+
+    mensal = _resumo(diario, "M")
+    mensal.insert(0, "Mês", mensal.pop("Período").dt.to_timestamp())
+    anual = _resumo(diario, "Y")
+    anual.insert(0, "Ano", anual.pop("Período").dt.year)
+
+    eventos = {
+        nome: diario[(diario["Data"] >= inicio) & (diario["Data"] <= fim)].reset_index(drop=True)
+        for nome, (inicio, fim) in EVENTOS.items()
+    }
+    return {"diario": diario, "mensal": mensal, "anual": anual, "eventos": eventos}
+
+
+def obter_agregados(df):
+    """
+    Agregados da versão dos dados de `df`, calculados na primeira chamada e reaproveitados depois.
+    :return: O dicionário de calcular_agregados mais "versao" (a versão dos dados).
+    """
+    versao = versao_dados(df)
+    with _trava:
+        if versao in _agregados:
+            return _agregados[versao]
+
+    # Fora da trava: o cálculo não bloqueia as leituras das outras versões
+    agregados = {**calcular_agregados(df), "versao": versao}
+    with _trava:
+        anteriores = [] if versao in _agregados else list(_agregados)
+        agregados = _agregados.setdefault(versao, agregados)
+        # Descarta as versões mais antigas (o dicionário mantém a ordem de inserção)
+        while len(_agregados) > MAXIMO_VERSOES:
+            del _agregados[next(iter(_agregados))]
+
+    # Nova versão dos dados: as sessões passam a pedir as figuras dela, e as das versões anteriores
+    # deixam o cache de figuras em vez de esperar o descarte por LRU
+    for anterior in anteriores:
+        cache_figuras.descartar(anterior)
+    return agregados
+
@@ -3,6 +3,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from operacoes.agregados import obter_agregados
+from operacoes.cache_figuras import obter_figura
+from operacoes.graficos import PONTOS_POR_GRAFICO, reduzir_serie, selecionar_periodo
 
 
 def analises_historicas(df):
@@ -15,6 +18,12 @@ def analises_historicas(df):
     )
     st.markdown("---")
 
+    # Retornos, médias e janelas de eventos: calculados uma vez por versão dos dados (o df não é alterado)
+    agregados = obter_agregados(df)
+    diario = agregados["diario"]
+    # As figuras são montadas uma vez por versão dos dados e período (ver operacoes.cache_figuras)
+    versao = agregados["versao"]
+
     # 1. Evolução do preço ao longo do tempo com eventos geopolíticos
     st.header("🌍 Evolução do Preço com Eventos Geopolíticos")
     st.write(
@@ -26,40 +35,51 @@ def analises_historicas(df):
     """
     )
 
-    fig1 = px.line(
-        df,
-        x="Data",
-        y="Preço (US$)",
-        title="Evolução do Preço do Petróleo Brent com Eventos Geopolíticos",
-        # color_discrete_sequence=["#0047AB"],
-    )
+    # Série reduzida (LTTB) ao orçamento de pontos do gráfico; um período menor aparece com mais detalhes
+    periodo = selecionar_periodo("periodo_preco_historico", diario["Data"])
 
-    eventos = {
-        "2008-09-15": ("Crise Financeira 2008", "#C70039"),
-        "2020-03-01": ("COVID-19", "#0000FF"),
-        "2022-02-24": ("Guerra Ucrânia", "#2CA02C"),
-    }
-
-    for data, (texto, cor) in eventos.items():
-        fig1.add_vline(x=pd.Timestamp(data), line_dash="dash", line_color=cor)
-        fig1.add_annotation(
-            x=pd.Timestamp(data),
-            y=df["Preço (US$)"].max(),
-            text=texto,
-            showarrow=True,
-            
-            arrowhead=2,
-            font=dict(color=cor),
+    def construir_fig1():
+        df_grafico = reduzir_serie(diario, "Data", "Preço (US$)", PONTOS_POR_GRAFICO["preco_historico"], periodo)
+
+        fig1 = px.line(
+            df_grafico,
+            x="Data",
+            y="Preço (US$)",
+            title="Evolução do Preço do Petróleo Brent com Eventos Geopolíticos",
+            # color_discrete_sequence=["#0047AB"],
         )
 
-    fig1.update_layout(
-        xaxis_title="Ano",
-        yaxis_title="Preço (US$)",
-        plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
-        hovermode="x unified",
-        template="plotly_dark",
-    )
+        eventos = {
+            "2008-09-15": ("Crise Financeira 2008", "#C70039"),
+            "2020-03-01": ("COVID-19", "#0000FF"),
+            "2022-02-24": ("Guerra Ucrânia", "#2CA02C"),
+        }
+
+        for data, (texto, cor) in eventos.items():
+            # Com um período ampliado, só os eventos dentro dele (senão o eixo voltaria à série inteira)
+            if not df_grafico["Data"].min() <= pd.Timestamp(data) <= df_grafico["Data"].max():
+                continue
+            fig1.add_vline(x=pd.Timestamp(data), line_dash="dash", line_color=cor)
+            fig1.add_annotation(
+                x=pd.Timestamp(data),
+                y=df_grafico["Preço (US$)"].max(),
+                text=texto,
+                showarrow=True,
+            
+                arrowhead=2,
+                font=dict(color=cor),
+            )
+
+        fig1.update_layout(
+            xaxis_title="Ano",
+            yaxis_title="Preço (US$)",
+            plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
+            hovermode="x unified",
+            template="plotly_dark",
+        )
+        return fig1
 
+    fig1 = obter_figura(versao, "evolucao_preco", construir_fig1, periodo=periodo)
     st.plotly_chart(fig1, use_container_width=True)
 
     st.write(
@@ -75,26 +95,31 @@ def analises_historicas(df):
     # 2. Variação percentual mensal do preço
     st.header("📈 Variação Percentual Mensal")
 
-    df["Variação (%)"] = df["Preço (US$)"].pct_change() * 100
-
     # Criando o gráfico
-    fig2 = px.line(
-        df,
-        x="Data",
-        y="Variação (%)",
-        title="Variação Percentual Mensal do Preço do Petróleo",
-        line_shape="spline",
-        template="plotly_dark",
-        # color_discrete_sequence=["#D7263D"],  # Vermelho FIAP
-    )
+    periodo = selecionar_periodo("periodo_variacao_percentual", diario["Data"])
+
+    def construir_fig2():
+        df_grafico = reduzir_serie(diario, "Data", "Variação (%)", PONTOS_POR_GRAFICO["variacao_percentual"], periodo)
+
+        fig2 = px.line(
+            df_grafico,
+            x="Data",
+            y="Variação (%)",
+            title="Variação Percentual Mensal do Preço do Petróleo",
+            line_shape="spline",
+            template="plotly_dark",
+            # color_discrete_sequence=["#D7263D"],  # Vermelho FIAP
+        )
 
-    fig2.add_hline(y=0, line_dash="dash", line_color="red")
+        fig2.add_hline(y=0, line_dash="dash", line_color="red")
 
-    # Ajustando layout para melhor visualização
-    fig2.update_layout(
-        xaxis_title="Ano", yaxis_title="Variação (%)", hovermode="x unified", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
-    )
+        # Ajustando layout para melhor visualização
+        fig2.update_layout(
+            xaxis_title="Ano", yaxis_title="Variação (%)", hovermode="x unified", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
+        )
+        return fig2
 
+    fig2 = obter_figura(versao, "variacao_percentual", construir_fig2, periodo=periodo)
     st.plotly_chart(fig2, use_container_width=True)
 
     st.write(
@@ -110,42 +135,43 @@ def analises_historicas(df):
     # 3. Preço médio anual com destaques para crises
     st.header("📉 Preço Médio Anual com Destaque para Crises")
 
-    df["Ano"] = df["Data"].dt.year
-
-    # Calcular o preço médio por ano
-    df_media_anual = df.groupby("Ano")["Preço (US$)"].mean().reset_index()
-
-    # Criar o gráfico de barras
-    fig3 = px.bar(
-        df_media_anual,
-        x="Ano",
-        y="Preço (US$)",
-        title="Preço Médio Anual do Petróleo com Destaque para Crises",
-        # color_discrete_sequence=["#D7263D"],  # Cor das barras
-    )
-
-    eventos = {
-        2008: ("Crise Financeira 2008", "#C70039"),  # Amarelo
-        2020: ("COVID-19", "#0000FF"),  # Azul
-        2022: ("Guerra Ucrânia", "#2CA02C"),  # Verde
-    }
-
-    for ano, (evento, cor) in eventos.items():
-        fig3.add_vline(x=ano, line_dash="dash", line_color=cor)
-        fig3.add_annotation(
-            x=ano,
-            y=df_media_anual["Preço (US$)"].max()
-            * 1.05,  # Ajusta a posição para melhor visibilidade
-            text=evento,
-            showarrow=True,
-            arrowhead=2,
-            font=dict(color=cor, size=12),
+    def construir_fig3():
+        # Preço médio por ano
+        df_media_anual = agregados["anual"]
+
+        # Criar o gráfico de barras
+        fig3 = px.bar(
+            df_media_anual,
+            x="Ano",
+            y="Preço Médio (US$)",
+            title="Preço Médio Anual do Petróleo com Destaque para Crises",
+            # color_discrete_sequence=["#D7263D"],  # Cor das barras
         )
 
-    fig3.update_layout(
-        xaxis_title="Ano", yaxis_title="Preço Médio (US$)", template="plotly_dark", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
-    )
+        eventos = {
+            2008: ("Crise Financeira 2008", "#C70039"),  # Amarelo
+            2020: ("COVID-19", "#0000FF"),  # Azul
+            2022: ("Guerra Ucrânia", "#2CA02C"),  # Verde
+        }
+
+        for ano, (evento, cor) in eventos.items():
+            fig3.add_vline(x=ano, line_dash="dash", line_color=cor)
+            fig3.add_annotation(
+                x=ano,
+                y=df_media_anual["Preço Médio (US$)"].max()
+                * 1.05,  # Ajusta a posição para melhor visibilidade
+                text=evento,
+                showarrow=True,
+                arrowhead=2,
+                font=dict(color=cor, size=12),
+            )
+
+        fig3.update_layout(
+            xaxis_title="Ano", yaxis_title="Preço Médio (US$)", template="plotly_dark", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
+        )
+        return fig3
 
+    fig3 = obter_figura(versao, "media_anual", construir_fig3)
     st.plotly_chart(fig3, use_container_width=True)
 
     st.write(
@@ -162,34 +188,37 @@ def analises_historicas(df):
     # 4. Impacto da Crise Financeira de 2008
     st.header("📊 Impacto da Crise Financeira de 2008")
 
-    # Filtrar os dados entre 2007 e 2009
-    df_crise_2008 = df[(df["Data"] >= "2007-01-01") & (df["Data"] <= "2009-12-31")]
+    def construir_fig4():
+        # Dados entre 2007 e 2009
+        df_crise_2008 = agregados["eventos"]["crise_2008"]
 
-    fig4 = px.line(
-        df_crise_2008,
-        x="Data",
-        y="Preço (US$)",
-        title="Preço do Petróleo Antes e Após a Crise de 2008",
-        # color_discrete_sequence=["#D7263D"],
-    )
+        fig4 = px.line(
+            df_crise_2008,
+            x="Data",
+            y="Preço (US$)",
+            title="Preço do Petróleo Antes e Após a Crise de 2008",
+            # color_discrete_sequence=["#D7263D"],
+        )
 
-    # Adicionar linha vertical e anotação para a crise de 2008
-    fig4.add_vline(
-        x=pd.Timestamp("2008-09-15"), line_dash="dash", line_color="#C70039"
-    )  # Amarelo
-    fig4.add_annotation(
-        x=pd.Timestamp("2008-09-15"),
-        y=df_crise_2008["Preço (US$)"].max() * 1.05,
-        text="Crise 2008",
-        showarrow=True,
-        arrowhead=2,
-        font=dict(color="#C70039", size=12),
-    )
+        # Adicionar linha vertical e anotação para a crise de 2008
+        fig4.add_vline(
+            x=pd.Timestamp("2008-09-15"), line_dash="dash", line_color="#C70039"
+        )  # Amarelo
+        fig4.add_annotation(
+            x=pd.Timestamp("2008-09-15"),
+            y=df_crise_2008["Preço (US$)"].max() * 1.05,
+            text="Crise 2008",
+            showarrow=True,
+            arrowhead=2,
+            font=dict(color="#C70039", size=12),
+        )
 
-    fig4.update_layout(
-        xaxis_title="Ano", yaxis_title="Preço (US$)", template="plotly_dark", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
-    )
+        fig4.update_layout(
+            xaxis_title="Ano", yaxis_title="Preço (US$)", template="plotly_dark", plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
+        )
+        return fig4
 
+    fig4 = obter_figura(versao, "crise_2008", construir_fig4)
     st.plotly_chart(fig4, use_container_width=True)
 
     st.write(
@@ -205,24 +234,27 @@ def analises_historicas(df):
     # 5. Distribuição dos preços
     st.header("📊 Distribuição dos Preços")
 
-    fig5 = px.histogram(
-        df,
-        x="Preço (US$)",
-        nbins=30,
-        title="Distribuição dos Preços do Petróleo Brent",
-    )
+    def construir_fig5():
+        fig5 = px.histogram(
+            diario,
+            x="Preço (US$)",
+            nbins=30,
+            title="Distribuição dos Preços do Petróleo Brent",
+        )
 
-    # Adicionando borda preta nas barras
-    fig5.update_traces(marker=dict(line=dict(color="black", width=1)))
+        # Adicionando borda preta nas barras
+        fig5.update_traces(marker=dict(line=dict(color="black", width=1)))
 
-    # Personalizando layout
-    fig5.update_layout(
-        xaxis_title="Preço (US$)",
-        yaxis_title="Frequência",
-        template="plotly_white",  # Fundo branco para melhor contraste
-        plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
-    )
+        # Personalizando layout
+        fig5.update_layout(
+            xaxis_title="Preço (US$)",
+            yaxis_title="Frequência",
+            template="plotly_white",  # Fundo branco para melhor contraste
+            plot_bgcolor="#F8F8F8",  # Fundo do gráfico com tom cinza claro
+        )
+        return fig5
 
+    fig5 = obter_figura(versao, "distribuicao", construir_fig5)
     st.plotly_chart(fig5, use_container_width=True)
 
     st.write(
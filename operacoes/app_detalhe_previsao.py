@@ -1,4 +1,6 @@
 import streamlit as st
+from operacoes.backtest import ler_backtest
+from operacoes.registro import ler_manifesto
 
 
 def detalhe_previsao():
@@ -11,24 +13,7 @@ def detalhe_previsao():
 
     st.markdown("---")
     st.header("📏 Métricas de Desempenho")
-    st.write(
-        """
-    Abaixo estão as métricas de desempenho do modelo ajustado:
-    """
-    )
-
-    # Valores das métricas
-    rmse_ajustado = 5.346641716678905
-    mae_ajustado = 2.7844824427972106
-    mape_ajustado = 5.854750854854621
-
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric(label="RMSE", value=f"{rmse_ajustado:.2f}")
-    with col2:
-        st.metric(label="MAE", value=f"{mae_ajustado:.2f}")
-    with col3:
-        st.metric(label="MAPE", value=f"{mape_ajustado:.2f}%")
+    mostrar_metricas()
     st.markdown("---")
 
     st.header("🎯 Analise do Modelo")
@@ -83,9 +68,8 @@ def detalhe_previsao():
     st.subheader("1. Pré-processamento dos Dados")
     st.write(
         """
-    - 📅 Criação de features de calendário (ano, mês, dia, dia da semana).
-    - 📊 Cálculo da média móvel de 12 meses como baseline.
-    - 🧹 Tratamento de valores ausentes e outliers.
+    - 🧹 Tratamento de valores ausentes e duplicatas.
+    - 📅 Ordenação cronológica da série diária de preços.
     """
     )
 
@@ -110,7 +94,8 @@ def detalhe_previsao():
         """
     - O XGBoost é treinado para prever os resíduos com base em features como:
         - Lags dos resíduos (valores passados).
-        - Features de calendário.
+        - Média, desvio, mínimo e máximo móveis dos resíduos em janelas de 1 e 12 meses (21 e 252 dias úteis).
+        - Features de calendário (ano, mês, dia, dia da semana).
     """
     )
 
@@ -144,5 +129,48 @@ def detalhe_previsao():
     )
 
 
+def mostrar_metricas():
+    # Métricas do backtest walk-forward da versão atual (python -m operacoes.backtest)
+    backtest = ler_backtest()
+    if backtest is not None:
+        parametros = backtest["parametros"]
+        st.write(
+            f"""
+    Abaixo estão as métricas de desempenho do modelo ajustado, obtidas em um backtest walk-forward com
+    **{len(backtest["dobras"])} cortes**: a cada {parametros["passo"]} dias o modelo é treinado apenas com os
+    dados anteriores ao corte e prevê os {parametros["horizonte"]} dias seguintes.
+    """
+        )
+        metricas = backtest["metricas"]
+    else:
+        # Sem backtest: usa a avaliação no conjunto de teste (20% finais) feita no treino
+        manifesto = ler_manifesto()
+        versao = manifesto["atual"]
+        metricas = manifesto["versoes"].get(versao, {}).get("metricas_teste") if versao else None
+        if metricas is None:
+            st.info("ℹ️ Métricas indisponíveis. Execute: python -m operacoes.treinar e python -m operacoes.backtest")
+            return
+        st.write(
+            """
+    Abaixo estão as métricas de desempenho do modelo ajustado no conjunto de teste (20% finais da série):
+    """
+        )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(label="RMSE", value=f"{metricas['rmse']:.2f}")
+    with col2:
+        st.metric(label="MAE", value=f"{metricas['mae']:.2f}")
+    with col3:
+        st.metric(label="MAPE", value=f"{metricas['mape']:.2f}%")
+
+    if backtest is not None:
+        prophet = backtest["metricas_prophet"]
+        st.caption(
+            f"Somente Prophet, sem a correção do XGBoost: RMSE {prophet['rmse']:.2f}, "
+            f"MAE {prophet['mae']:.2f}, MAPE {prophet['mape']:.2f}%"
+        )
+
+
 if __name__ == "__main__":
     detalhe_previsao()
@@ -87,13 +87,17 @@ def detalhe_deploy():
 
     st.subheader("🔄 5. Atualização do Modelo no Deploy")
     st.write("""
-    Para atualizar o modelo de Machine Learning no Streamlit Cloud,
-    o arquivo `modelo_ml.pkl` foi substituído por um novo modelo e os seguintes comandos foram usados:
+    O treino não acontece dentro do dashboard: os modelos são treinados offline e gravados como
+    uma nova versão em `modelo/`, que o dashboard apenas carrega. Para atualizar o modelo no Streamlit Cloud,
+    os seguintes comandos foram usados:
     """)
 
     st.code("""
-    # Adicionar o novo modelo ao repositório Git
-    git add modelo_ml.pkl
+    # Treinar os modelos com os dados mais recentes do IPEA
+    python -m operacoes.treinar --atualizar-dados
+
+    # Adicionar a nova versão do modelo ao repositório Git
+    git add modelo/
 
     # Criar um commit com a atualização
     git commit -m "Atualização do modelo de Machine Learning"
@@ -3,7 +3,10 @@ from datetime import datetime, date
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from operacoes.carregar_modelo import carregar_e_treinar_modelos, criar_tabela_previsoes
+from operacoes.cache_figuras import obter_figura
+from operacoes.carregar_modelo import carregar_previsoes, criar_tabela_previsoes
+from operacoes.graficos import PONTOS_POR_GRAFICO, reduzir_series, selecionar_periodo
+from operacoes.registro import ler_manifesto
 
 
 def modelo_de_previsao():
@@ -12,8 +15,12 @@ def modelo_de_previsao():
         "Explore as previsões do modelo para o preço do petróleo Brent nos próximos dias e anos, com análise detalhada das tendências."
     )
 
-    # Carregar e treinar os modelos
-    df, prophet, model_xgb, test, prophet_future = carregar_e_treinar_modelos()
+    # Carregar o histórico e a previsão do modelo já treinado (treino offline: python -m operacoes.treinar)
+    try:
+        df, prophet_future = carregar_previsoes()
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
+        return
 
     # Converter as colunas para datetime
     df["Data"] = pd.to_datetime(df["Data"])
@@ -35,30 +42,41 @@ def modelo_de_previsao():
     anos_marcados = list(range(2005, 2027))
 
     st.write("### Gráfico de Preço Real vs. US$ Preço Previsto")
-    fig1 = px.line(
-        df_completo,
-        x="Data",
-        y=["Preço Real", "US$ Preço Previsto"],
-        labels={"value": "Preço (US$)", "variable": "Legenda"},
-        title="Preço Real vs. US$ Preço Previsto",
-        color_discrete_map={
-            "Preço Real": "#D7263D",
-            "US$ Preço Previsto": "blue",
-        },
-    )
+    # Cada série reduzida (LTTB) ao orçamento de pontos do gráfico
+    periodo = selecionar_periodo("periodo_real_vs_previsto", df_completo["Data"])
 
-    fig1.update_layout(
-        xaxis_title="Data",
-        yaxis_title="Preço (US$)",
-        legend_title="Legenda",
-        hovermode="x unified",
-        xaxis=dict(
-            tickmode="array",
-            tickvals=pd.to_datetime([f"{ano}-01-01" for ano in anos_marcados]),
-            tickformat="%Y",
-        ),
-    )
+    def construir_fig1():
+        df_grafico = reduzir_series(
+            df_completo, "Data", ["Preço Real", "US$ Preço Previsto"], PONTOS_POR_GRAFICO["real_vs_previsto"], periodo
+        )
+        fig1 = px.line(
+            df_grafico,
+            x="Data",
+            y="value",
+            color="variable",
+            labels={"value": "Preço (US$)", "variable": "Legenda"},
+            title="Preço Real vs. US$ Preço Previsto",
+            color_discrete_map={
+                "Preço Real": "#D7263D",
+                "US$ Preço Previsto": "blue",
+            },
+        )
+
+        fig1.update_layout(
+            xaxis_title="Data",
+            yaxis_title="Preço (US$)",
+            legend_title="Legenda",
+            hovermode="x unified",
+            xaxis=dict(
+                tickmode="array",
+                tickvals=pd.to_datetime([f"{ano}-01-01" for ano in anos_marcados]),
+                tickformat="%Y",
+            ),
+        )
+        return fig1
 
+    # Montada uma vez por versão dos modelos e período (ver operacoes.cache_figuras)
+    fig1 = obter_figura(ler_manifesto()["atual"], "real_vs_previsto", construir_fig1, periodo=periodo)
     st.plotly_chart(fig1)
 
     data_limite = date(2026, 12, 31)
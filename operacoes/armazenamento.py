@@ -0,0 +1,96 @@
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from operacoes.gravacao import arquivo_atomico
+
+DIRETORIO_DADOS = "dados"
+
+# Formato canônico: Parquet tipado (lido com memory map); o CSV fica apenas para compatibilidade
+CAMINHO_PARQUET = os.path.join(DIRETORIO_DADOS, "dados_petroleo_brent.parquet")
+CAMINHO_CSV = os.path.join(DIRETORIO_DADOS, "dados_petroleo_brent_2005_2025.csv")
+
+# Coluna de valores da série do Brent; as demais séries do IPEA usam o nome definido na ingestão
+COLUNA_PRECO = "Preço (US$)"
+
+
+def esquema(coluna=COLUNA_PRECO):
+    return pa.schema(
+        [
+            pa.field("Data", pa.timestamp("ns"), nullable=False),
+            pa.field(coluna, pa.float64()),
+        ]
+    )
+
+
+ESQUEMA = esquema()
+
+
+def _para_tabela(df, coluna=COLUNA_PRECO):
+    df = df[["Data", coluna]]
+    return pa.Table.from_pandas(df, schema=esquema(coluna), preserve_index=False)
+
+
+def salvar_dados(df, caminho=CAMINHO_PARQUET, coluna=COLUNA_PRECO):
+    """Grava a série no formato colunar, já com os tipos do esquema (datetime64 e float64)."""
+    # Gravação atômica: o treino e o dashboard podem estar lendo a série enquanto ela é atualizada
+    with arquivo_atomico(caminho) as arquivo:
+        pq.write_table(_para_tabela(df, coluna), arquivo)
+
+
+def ler_dados(caminho=CAMINHO_PARQUET, coluna=COLUNA_PRECO):
+    """
+    Lê a série do armazenamento colunar.
+    Se o Parquet ainda não existir, importa o CSV legado (quando houver) e passa a usar o Parquet.
+    :param coluna: Nome da coluna de valores.
+    :return: DataFrame com "Data" (datetime64) e a coluna de valores (float64).
+    """
+    if not os.path.exists(caminho):
+        if caminho != CAMINHO_PARQUET or not os.path.exists(CAMINHO_CSV):
+            raise FileNotFoundError(caminho)
+        return importar_csv(CAMINHO_CSV, caminho)
+
+    tabela = pq.read_table(caminho, memory_map=True)
+    if coluna not in tabela.column_names:
+        # Arquivo gravado com outro nome para a coluna de valores (sempre a segunda)
+        tabela = tabela.rename_columns(["Data", coluna])
+    return tabela.cast(esquema(coluna)).to_pandas()
+
+
+def acrescentar_dados(df_novos, caminho=CAMINHO_PARQUET, coluna=COLUNA_PRECO):
+    """Acrescenta linhas novas à série local e retorna a série completa em ordem cronológica."""
+    try:
+        df = pd.concat([ler_dados(caminho, coluna), df_novos[["Data", coluna]]], ignore_index=True)
+    except FileNotFoundError:
+        df = df_novos[["Data", coluna]]
+
+    df = df.drop_duplicates(subset=["Data"], keep="last").sort_values("Data").reset_index(drop=True)
+    salvar_dados(df, caminho, coluna)
+    return df
+
+
+def importar_csv(caminho_csv=CAMINHO_CSV, caminho=CAMINHO_PARQUET):
+    df = pd.read_csv(caminho_csv)
+    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
+    df["Preço (US$)"] = pd.to_numeric(df["Preço (US$)"], errors="coerce")
+    df = df.dropna(subset=["Data"]).sort_values("Data").reset_index(drop=True)
+    salvar_dados(df, caminho)
+    return ler_dados(caminho)
+
+
+def exportar_csv(caminho_csv=CAMINHO_CSV, caminho=CAMINHO_PARQUET):
+    df = ler_dados(caminho)
+    df.to_csv(caminho_csv, index=False, encoding="utf-8")
+    return caminho_csv
+
+
+def versao_dados(df):
+    """Hash do conteúdo da série (datas e preços), usado para identificar a versão dos dados."""
+    datas = df["Data"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    precos = df["Preço (US$)"].to_numpy(dtype=np.float64)
+    hash_dados = hashlib.sha256()
+    hash_dados.update(np.ascontiguousarray(datas).tobytes())
+    hash_dados.update(np.ascontiguousarray(precos).tobytes())
+    return hash_dados.hexdigest()
@@ -0,0 +1,220 @@
+"""
+Backtest walk-forward do modelo híbrido (Prophet + XGBoost nos resíduos).
+
+Uso:
+    python -m operacoes.backtest                         # versão atual, todos os núcleos
+    python -m operacoes.backtest --horizonte 30 --passo 90 --processos 16
+
+Cada dobra treina os dois modelos só com os dados até o corte e prevê os dias seguintes.
+As dobras são distribuídas em um pool de processos e o resultado fica salvo junto da versão
+do modelo, um arquivo por conjunto de parâmetros: os parâmetros padrão em
+modelo/versoes/<versao>/backtest.json, de onde a página de métricas o lê, e os demais em
+backtest_h<horizonte>_p<passo>_t<treino_minimo>.json, sem substituir o resultado da página.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from operacoes.gravacao import arquivo_atomico
+
+ARQUIVO_BACKTEST = "backtest.json"
+
+PARAMETROS_PADRAO = {"horizonte": 30, "passo": 90, "treino_minimo": 3 * 365}
+
+# Estado de cada processo do pool (os dados são enviados uma única vez, na inicialização)
+_dados_processo = {}
+
+
+def gerar_cortes(datas, horizonte, passo, treino_minimo):
+    """Datas de corte: a primeira após o treino mínimo e depois a cada `passo` dias."""
+    datas = pd.to_datetime(pd.Series(datas)).sort_values()
+    corte = datas.iloc[0] + pd.Timedelta(days=treino_minimo)
+    ultimo = datas.iloc[-1] - pd.Timedelta(days=horizonte)
+
+    cortes = []
+    while corte <= ultimo:
+        cortes.append(corte)
+        corte += pd.Timedelta(days=passo)
+    return cortes
+
+
+def _inicializar_processo(df, config):
+    # Um processo por núcleo: cada um usa uma única thread no XGBoost e nas bibliotecas numéricas
+    for variavel in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variavel] = "1"
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    logging.getLogger("prophet").setLevel(logging.WARNING)
+
+    config = {**config, "xgboost": {**config["xgboost"], "n_jobs": 1}}
+    _dados_processo.update(df=df, config=config)
+
+
+def avaliar_dobra(corte, horizonte):
+    """Treina com os dados até o corte e prevê os `horizonte` dias seguintes."""
+    import xgboost as xgb
+    from operacoes.carregar_modelo import ajustar_prophet, prever_yhat
+    from operacoes.features import montar_features
+    from operacoes.previsao_residuos import prever_residuos
+
+    df = _dados_processo["df"]
+    config = _dados_processo["config"]
+
+    treino = df[df["ds"] <= corte]
+    teste = df[(df["ds"] > corte) & (df["ds"] <= corte + pd.Timedelta(days=horizonte))]
+
+    prophet = ajustar_prophet(treino, config)
+    residuo = treino["y"].to_numpy() - prever_yhat(prophet, treino["ds"])
+
+    # Mesmas features do treino do modelo
+    X, y, _ = montar_features(residuo, treino["ds"], config)
+    model_xgb = xgb.XGBRegressor(**config["xgboost"])
+    model_xgb.fit(X, y)
+
+    # Como no cubo de previsões: rollout recursivo do resíduo a partir dos resíduos até o corte
+    residuo_previsto = prever_residuos(model_xgb, residuo, teste["ds"], config)
+
+    yhat = prever_yhat(prophet, teste["ds"])
+    real = teste["y"].to_numpy()
+
+    return {
+        "corte": corte.strftime("%Y-%m-%d"),
+        "dias": len(teste),
+        "real": real.tolist(),
+        "previsto": (yhat + residuo_previsto).tolist(),
+        "previsto_prophet": yhat.tolist(),
+    }
+
+
+def executar_backtest(df, config, horizonte, passo, treino_minimo, processos=None):
+    """
+    Executa as dobras em paralelo.
+    :param df: DataFrame com as colunas "ds" e "y".
+    :return: Dicionário com as métricas agregadas e as métricas por dobra.
+    """
+    from operacoes.carregar_modelo import calcular_metricas
+
+    cortes = gerar_cortes(df["ds"], horizonte, passo, treino_minimo)
+    if not cortes:
+        raise ValueError("Histórico curto demais para os parâmetros do backtest.")
+
+    # Processos efetivamente usados pelo pool (não mais que as dobras), registrados no resultado
+    processos = min(processos or os.cpu_count(), len(cortes))
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=processos, initializer=_inicializar_processo, initargs=(df, config)
+    ) as executor:
+        dobras = list(executor.map(avaliar_dobra, cortes, [horizonte] * len(cortes)))
+    duracao = time.perf_counter() - inicio
+
+    real = np.concatenate([dobra["real"] for dobra in dobras])
+    previsto = np.concatenate([dobra["previsto"] for dobra in dobras])
+    previsto_prophet = np.concatenate([dobra["previsto_prophet"] for dobra in dobras])
+
+    return {
+        "parametros": {"horizonte": horizonte, "passo": passo, "treino_minimo": treino_minimo},
+        "criado_em": datetime.now().isoformat(timespec="seconds"),
+        "duracao_s": round(duracao, 1),
+        "processos": processos,
+        "metricas": calcular_metricas(real, previsto),
+        "metricas_prophet": calcular_metricas(real, previsto_prophet),
+        "dobras": [
+            {
+                "corte": dobra["corte"],
+                "dias": dobra["dias"],
+                **calcular_metricas(dobra["real"], dobra["previsto"]),
+            }
+            for dobra in dobras
+        ],
+    }
+
+
+def arquivo_backtest(parametros=PARAMETROS_PADRAO):
+    """Nome do arquivo do resultado: backtest.json para os parâmetros padrão, um nome próprio para os demais."""
+    if parametros == PARAMETROS_PADRAO:
+        return ARQUIVO_BACKTEST
+    return "backtest_h{horizonte}_p{passo}_t{treino_minimo}.json".format(**parametros)
+
+
+def caminho_backtest(versao=None, parametros=PARAMETROS_PADRAO):
+    # Pelo registro, sem importar o código de treino: a página de métricas só lê o resultado
+    from operacoes.registro import diretorio_versao
+
+    return os.path.join(diretorio_versao(versao), arquivo_backtest(parametros))
+
+
+def ler_backtest(versao=None, parametros=PARAMETROS_PADRAO):
+    """
+    Resultado salvo do backtest da versão (atual, por padrão) com os parâmetros informados (os
+    padrão, usados pela página de métricas), ou None se ainda não foi executado.
+    """
+    try:
+        with open(caminho_backtest(versao, parametros), encoding="utf-8") as arquivo:
+            resultado = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    # backtest.json de versões antigas podia ter sido gravado com outros parâmetros
+    if resultado["parametros"] != parametros:
+        return None
+    return resultado
+
+
+def backtest_versao(versao=None, parametros=PARAMETROS_PADRAO, processos=None, forcar=False):
+    """Backtest da versão do modelo, reaproveitando o resultado salvo para os mesmos parâmetros."""
+    from operacoes.carregar_modelo import ARQUIVO_HISTORICO, CONFIG_PADRAO
+    from operacoes.registro import diretorio_versao, ler_manifesto
+
+    manifesto = ler_manifesto()
+    versao = versao or manifesto["atual"]
+    diretorio = diretorio_versao(versao, manifesto)
+
+    if not forcar:
+        resultado = ler_backtest(versao, parametros)
+        if resultado is not None:
+            return resultado
+
+    historico = pd.read_parquet(os.path.join(diretorio, ARQUIVO_HISTORICO))
+    df = pd.DataFrame({"ds": historico["Data"], "y": historico["Preço Real"]})
+    config = manifesto["versoes"][versao].get("config", CONFIG_PADRAO)
+
+    resultado = executar_backtest(df, config, processos=processos, **parametros)
+    resultado["versao"] = versao
+
+    with arquivo_atomico(caminho_backtest(versao, parametros), "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest walk-forward do modelo Prophet + XGBoost.")
+    parser.add_argument("--versao", help="Versão do modelo (padrão: a atual).")
+    parser.add_argument("--horizonte", type=int, default=PARAMETROS_PADRAO["horizonte"], help="Dias previstos por dobra.")
+    parser.add_argument("--passo", type=int, default=PARAMETROS_PADRAO["passo"], help="Dias entre os cortes.")
+    parser.add_argument("--treino-minimo", type=int, default=PARAMETROS_PADRAO["treino_minimo"], help="Dias antes do 1º corte.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool (padrão: núcleos da máquina).")
+    parser.add_argument("--forcar", action="store_true", help="Refaz o backtest mesmo se houver resultado salvo.")
+    args = parser.parse_args()
+
+    parametros = {"horizonte": args.horizonte, "passo": args.passo, "treino_minimo": args.treino_minimo}
+    resultado = backtest_versao(args.versao, parametros, args.processos, args.forcar)
+
+    metricas = resultado["metricas"]
+    print(
+        f"✅ Backtest da versão {resultado['versao']}: {len(resultado['dobras'])} dobras em "
+        f"{resultado['duracao_s']} s com {resultado['processos']} processos"
+    )
+    print(f"📏 RMSE {metricas['rmse']:.2f}, MAE {metricas['mae']:.2f}, MAPE {metricas['mape']:.2f}%")
+    if parametros != PARAMETROS_PADRAO:
+        print(
+            f"ℹ️ Salvo em {arquivo_backtest(parametros)}; a página de métricas usa os parâmetros padrão "
+            f"({ARQUIVO_BACKTEST})."
+        )
+
+
+if __name__ == "__main__":
+    main()
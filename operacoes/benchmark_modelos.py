@@ -0,0 +1,125 @@
+"""
+Benchmark de carregamento dos modelos: pickles do joblib contra os formatos nativos (JSON do Prophet e
+UBJSON do XGBoost, com conferência do checksum).
+
+Uso:
+    python -m operacoes.benchmark_modelos                # versão atual dos modelos
+    python -m operacoes.benchmark_modelos --versao <versao> --repeticoes 20
+
+O carregamento "frio" é a primeira leitura em um processo novo, como em uma réplica que acabou de subir
+(o tempo de importação das bibliotecas é mostrado à parte); o "quente" é o melhor tempo de várias
+leituras no mesmo processo.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def _ler_pickle(caminho, checksum=None):
+    import joblib
+
+    return joblib.load(caminho)
+
+
+def _leitores():
+    from operacoes import formato_modelos
+
+    return {
+        "pickle": {"prophet": _ler_pickle, "xgboost": _ler_pickle},
+        "nativo": {"prophet": formato_modelos.ler_prophet, "xgboost": formato_modelos.ler_xgb},
+    }
+
+
+def _carregamento_frio(formato, modelo, caminho, checksum, fila):
+    # Executado em processo novo, como no primeiro acesso de uma réplica. As importações das bibliotecas
+    # custam o mesmo nos dois formatos e ficam de fora, para não esconder a diferença na leitura.
+    import importlib
+
+    inicio = time.perf_counter()
+    importlib.import_module(modelo)
+    leitor = _leitores()[formato][modelo]
+    importacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    leitor(caminho, checksum)
+    fila.put((importacao, time.perf_counter() - inicio))
+
+
+def preparar_arquivos(versao, diretorio):
+    """Grava os modelos da versão nos dois formatos e retorna {(formato, modelo): (caminho, checksum)}."""
+    import joblib
+    from operacoes import formato_modelos
+    from operacoes.carregar_modelo import carregar_modelo_versao, diretorio_versao, ler_manifesto
+
+    manifesto = ler_manifesto()
+    metadados = manifesto["versoes"][versao]
+    arquivos = {}
+    for modelo, salvar, nome in [
+        ("prophet", formato_modelos.salvar_prophet, formato_modelos.ARQUIVO_PROPHET_JSON),
+        ("xgboost", formato_modelos.salvar_xgb, formato_modelos.ARQUIVO_XGB_UBJ),
+    ]:
+        objeto = carregar_modelo_versao(diretorio_versao(versao, manifesto), metadados, modelo)
+        caminho_pickle = os.path.join(diretorio, f"{modelo}.pkl")
+        joblib.dump(objeto, caminho_pickle)
+        arquivos[("pickle", modelo)] = (caminho_pickle, None)
+
+        caminho_nativo = os.path.join(diretorio, nome)
+        arquivos[("nativo", modelo)] = (caminho_nativo, salvar(objeto, caminho_nativo))
+    return arquivos
+
+
+def medir(arquivos, repeticoes):
+    contexto = multiprocessing.get_context("spawn")
+    leitores = _leitores()
+    resultados = {}
+
+    for (formato, modelo), (caminho, checksum) in arquivos.items():
+        fila = contexto.Queue()
+        processo = contexto.Process(target=_carregamento_frio, args=(formato, modelo, caminho, checksum, fila))
+        processo.start()
+        processo.join()
+        if processo.exitcode != 0:
+            raise RuntimeError(f"Falha ao carregar {caminho} em um processo novo.")
+        importacao, frio = fila.get()
+
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            leitores[formato][modelo](caminho, checksum)
+            tempos.append(time.perf_counter() - inicio)
+
+        resultados[(formato, modelo)] = (os.path.getsize(caminho), importacao, frio, min(tempos))
+    return resultados
+
+
+def main():
+    from operacoes.carregar_modelo import diretorio_versao, ler_manifesto
+
+    parser = argparse.ArgumentParser(description="Benchmark de carregamento dos modelos (pickle x nativo).")
+    parser.add_argument("--versao", help="Versão do modelo (padrão: a atual).")
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    versao = args.versao or ler_manifesto()["atual"]
+    diretorio_versao(versao)  # levanta FileNotFoundError se não houver modelo treinado
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultados = medir(preparar_arquivos(versao, diretorio), args.repeticoes)
+
+    print(f"Versão {versao}, carregamento quente: melhor de {args.repeticoes} leituras")
+    for modelo in ("prophet", "xgboost"):
+        tamanho_base, _, frio_base, quente_base = resultados[("pickle", modelo)]
+        for formato in ("pickle", "nativo"):
+            tamanho, importacao, frio, quente = resultados[(formato, modelo)]
+            print(
+                f"{modelo:<8} {formato:<7} {tamanho / 1024:8.1f} KiB ({tamanho / tamanho_base:4.2f}x)"
+                f"   frio {frio * 1000:8.1f} ms ({frio_base / frio:4.1f}x)"
+                f"   quente {quente * 1000:7.2f} ms ({quente_base / quente:4.1f}x)"
+                f"   importação {importacao * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
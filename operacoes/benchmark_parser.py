@@ -0,0 +1,127 @@
+"""
+Benchmark do parser da página do IPEA: caminho antigo (BeautifulSoup + pd.read_html) contra o
+extrator de passada única (operacoes.parser_ipea).
+
+Uso:
+    python -m operacoes.benchmark_parser --salvar        # baixa uma cópia da página
+    python -m operacoes.benchmark_parser dados/pagina_ipea_brent.html
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import time
+
+CAMINHO_PAGINA = os.path.join("dados", "pagina_ipea_brent.html")
+
+
+def parser_antigo(conteudo):
+    # Mesmo processamento de carregar_base_dados antes do extrator de passada única
+    import pandas as pd
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(conteudo, "html.parser")
+    table = soup.find("table", {"class": "dxgvTable"})
+    df = pd.read_html(io.StringIO(str(table)))[0]
+    df.columns = ["Data", "Preço (US$)"]
+    df = df[df["Data"].str.match(r"\d{2}/\d{2}/\d{4}", na=False)]
+    df["Data"] = pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce")
+    df["Preço (US$)"] = df["Preço (US$)"].astype(str).str.replace(",", ".").astype(float) / 100
+    return df
+
+
+def parser_novo(conteudo):
+    from operacoes.parser_ipea import extrair_serie
+
+    return extrair_serie(conteudo)
+
+
+PARSERS = {"antigo (bs4 + read_html)": parser_antigo, "passada única (lxml)": parser_novo}
+
+
+def _rss_kib(campo):
+    with open("/proc/self/status") as arquivo:
+        for linha in arquivo:
+            if linha.startswith(campo + ":"):
+                return int(linha.split()[1])
+    raise RuntimeError(f"Campo {campo} indisponível em /proc/self/status.")
+
+
+def _pico_memoria(nome, conteudo, fila):
+    # Executado em processo separado: mede o pico de RSS adicionado pelo parse (Linux)
+    parser = PARSERS[nome]
+    try:
+        parser(b"<table class='dxgvTable'><tr><td>01/01/2025</td><td>1,00</td></tr></table>")  # aquece os imports
+    except ValueError:
+        pass
+
+    # Zera o pico de RSS (VmHWM) para que os imports não entrem na medição
+    with open("/proc/self/clear_refs", "w") as arquivo:
+        arquivo.write("5")
+    antes = _rss_kib("VmRSS")
+    parser(conteudo)
+    depois = _rss_kib("VmHWM")
+    fila.put(max(depois - antes, 0) / 1024)
+
+
+def medir(conteudo, repeticoes):
+    contexto = multiprocessing.get_context("spawn")
+    resultados = {}
+
+    for nome, parser in PARSERS.items():
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            parser(conteudo)
+            tempos.append(time.perf_counter() - inicio)
+
+        fila = contexto.Queue()
+        processo = contexto.Process(target=_pico_memoria, args=(nome, conteudo, fila))
+        processo.start()
+        processo.join()
+        if processo.exitcode != 0:
+            raise RuntimeError(f"Falha ao medir a memória do parser {nome}.")
+        memoria = fila.get()
+
+        resultados[nome] = (min(tempos), memoria)
+
+    return resultados
+
+
+def baixar_pagina(caminho):
+    from operacoes.cliente_ipea import obter_cliente
+    from operacoes.carregar_tabela import SERID_BRENT
+
+    conteudo = obter_cliente().buscar_serie(SERID_BRENT, condicional=False)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(conteudo)
+    print(f"✅ Página salva em {caminho}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do parser da página do IPEA.")
+    parser.add_argument("pagina", nargs="?", default=CAMINHO_PAGINA, help="Cópia salva da página ExibeSerie.")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--salvar", action="store_true", help="Baixa a página antes de medir.")
+    args = parser.parse_args()
+
+    if args.salvar:
+        baixar_pagina(args.pagina)
+
+    with open(args.pagina, "rb") as arquivo:
+        conteudo = arquivo.read()
+
+    print(f"Página: {args.pagina} ({len(conteudo) / 1024:.0f} KiB), melhor de {args.repeticoes} execuções")
+    resultados = medir(conteudo, args.repeticoes)
+
+    base_tempo, _ = resultados["antigo (bs4 + read_html)"]
+    for nome, (tempo, memoria) in resultados.items():
+        print(
+            f"{nome:<28} {tempo * 1000:9.1f} ms ({base_tempo / tempo:5.1f}x)"
+            f"   pico de memória +{memoria:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Comparação de configurações do Prophet (changepoint_prior_scale, seasonality_mode e sazonalidades
+anual/semanal) por validação cruzada em ordem temporal.
+
+Uso:
+    python -m operacoes.busca_prophet                  # grade padrão, todos os núcleos
+    python -m operacoes.busca_prophet --processos 8 --horizonte 90 --passo 180
+    python -m operacoes.busca_prophet --aplicar        # grava a vencedora em modelo/config_treino.json
+
+Cada par (configuração, corte) é um ajuste independente: o Prophet é treinado com os dados até o corte
+e avaliado nos `horizonte` dias seguintes, sempre dentro da parte de treino da série. Os pares rodam em
+um pool de processos e o resultado de cada um é gravado em modelo/buscas/prophet_<chave>.jsonl; ao
+rodar de novo, só os pares que faltam são ajustados (por exemplo, apenas uma configuração nova).
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+GRADE_PADRAO = {
+    "changepoint_prior_scale": [0.01, 0.05, 0.1, 0.5],
+    "seasonality_mode": ["additive", "multiplicative"],
+    "yearly_seasonality": [True, False],
+    "weekly_seasonality": [True, False],
+}
+
+PARAMETROS_PADRAO = {"horizonte": 90, "passo": 180, "treino_minimo": 3 * 365}
+
+# Estado de cada processo do pool (os dados são enviados uma única vez, na inicialização)
+_dados_processo = {}
+
+
+def gerar_configuracoes(grade=GRADE_PADRAO):
+    nomes = sorted(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[nome] for nome in nomes))]
+
+
+def chave_par(config_prophet, corte):
+    return json.dumps(config_prophet, sort_keys=True) + "|" + corte
+
+
+def _inicializar_processo(df):
+    for variavel in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variavel] = "1"
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    logging.getLogger("prophet").setLevel(logging.WARNING)
+    _dados_processo.update(df=df)
+
+
+def avaliar_par(config_prophet, corte, horizonte):
+    """Ajusta o Prophet com os dados até o corte e mede o erro nos `horizonte` dias seguintes."""
+    import pandas as pd
+    from operacoes.carregar_modelo import ajustar_prophet, calcular_metricas, prever_yhat
+
+    df = _dados_processo["df"]
+    corte_data = pd.Timestamp(corte)
+    treino = df[df["ds"] <= corte_data]
+    teste = df[(df["ds"] > corte_data) & (df["ds"] <= corte_data + pd.Timedelta(days=horizonte))]
+
+    inicio = time.perf_counter()
+    prophet = ajustar_prophet(treino, {"prophet": config_prophet})
+    previsto = prever_yhat(prophet, teste["ds"])
+
+    return {
+        "prophet": config_prophet,
+        "corte": corte,
+        "dias": len(teste),
+        **calcular_metricas(teste["y"], previsto),
+        "duracao_s": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def caminho_resultados(hash_dados, config, parametros):
+    """Arquivo de resultados: muda quando os dados, a divisão treino/teste ou os cortes mudam."""
+    from operacoes.carregar_modelo import MODELO_DIR
+
+    base = {"proporcao_treino": config["proporcao_treino"], **parametros}
+    texto = hash_dados + json.dumps(base, sort_keys=True)
+    chave = hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(MODELO_DIR, "buscas", f"prophet_{chave}.jsonl")
+
+
+def ler_resultados(caminho):
+    """Pares já avaliados, por chave (linhas truncadas por uma interrupção são ignoradas)."""
+    resultados = {}
+    if not os.path.exists(caminho):
+        return resultados
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                resultado = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            resultados[chave_par(resultado["prophet"], resultado["corte"])] = resultado
+    return resultados
+
+
+def resumir(resultados, configuracoes, cortes):
+    """Média das métricas dos cortes por configuração, da melhor para a pior (RMSE)."""
+    resumo = []
+    for config_prophet in configuracoes:
+        pares = [resultados[chave_par(config_prophet, corte)] for corte in cortes]
+        resumo.append(
+            {
+                "prophet": config_prophet,
+                **{nome: float(np.mean([par[nome] for par in pares])) for nome in ("rmse", "mae", "mape")},
+            }
+        )
+    return sorted(resumo, key=lambda item: item["rmse"])
+
+
+def buscar(df, config, grade=GRADE_PADRAO, parametros=PARAMETROS_PADRAO, processos=None):
+    """
+    Avalia (ou completa) a grade de configurações e retorna o resumo ordenado pelo RMSE médio.
+    :param df: DataFrame com "Data" e "Preço (US$)".
+    """
+    from operacoes.armazenamento import versao_dados
+    from operacoes.backtest import gerar_cortes
+    from operacoes.carregar_modelo import preparar_dados
+
+    df_prophet = preparar_dados(df)
+    df_prophet = df_prophet.iloc[: int(len(df_prophet) * config["proporcao_treino"])][["ds", "y"]]
+    cortes = [corte.strftime("%Y-%m-%d") for corte in gerar_cortes(df_prophet["ds"], **parametros)]
+    if not cortes:
+        raise ValueError("Histórico curto demais para os parâmetros da validação.")
+
+    caminho = caminho_resultados(versao_dados(df), config, parametros)
+    resultados = ler_resultados(caminho)
+    configuracoes = gerar_configuracoes(grade)
+    pendentes = [
+        (config_prophet, corte)
+        for config_prophet in configuracoes
+        for corte in cortes
+        if chave_par(config_prophet, corte) not in resultados
+    ]
+    print(
+        f"🔎 {len(configuracoes)} configurações x {len(cortes)} cortes: "
+        f"{len(pendentes)} ajustes pendentes ({caminho})"
+    )
+
+    if pendentes:
+        processos = min(processos or os.cpu_count(), len(pendentes))
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        inicio = time.perf_counter()
+        with open(caminho, "a", encoding="utf-8") as arquivo, ProcessPoolExecutor(
+            max_workers=processos, initializer=_inicializar_processo, initargs=(df_prophet,)
+        ) as executor:
+            futuros = [
+                executor.submit(avaliar_par, config_prophet, corte, parametros["horizonte"])
+                for config_prophet, corte in pendentes
+            ]
+            for numero, futuro in enumerate(as_completed(futuros), start=1):
+                resultado = futuro.result()
+                # Uma linha por ajuste, gravada assim que termina
+                arquivo.write(json.dumps(resultado) + "\n")
+                arquivo.flush()
+                resultados[chave_par(resultado["prophet"], resultado["corte"])] = resultado
+                if numero % 10 == 0 or numero == len(pendentes):
+                    print(f"   {numero}/{len(pendentes)} em {time.perf_counter() - inicio:.1f} s")
+
+    return resumir(resultados, configuracoes, cortes)
+
+
+def aplicar_melhor(melhor):
+    """Grava a configuração vencedora do Prophet na configuração de treino (python -m operacoes.treinar)."""
+    from operacoes.carregar_modelo import salvar_ajustes
+
+    return salvar_ajustes(prophet=dict(melhor["prophet"]))
+
+
+def main():
+    from operacoes.carregar_modelo import carregar_config
+    from operacoes.treinar import carregar_dados_treino
+
+    parser = argparse.ArgumentParser(description="Validação cruzada de configurações do Prophet.")
+    parser.add_argument("--horizonte", type=int, default=PARAMETROS_PADRAO["horizonte"], help="Dias avaliados por corte.")
+    parser.add_argument("--passo", type=int, default=PARAMETROS_PADRAO["passo"], help="Dias entre os cortes.")
+    parser.add_argument("--treino-minimo", type=int, default=PARAMETROS_PADRAO["treino_minimo"], help="Dias antes do 1º corte.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool (padrão: núcleos da máquina).")
+    parser.add_argument("--aplicar", action="store_true", help="Grava a vencedora em modelo/config_treino.json.")
+    args = parser.parse_args()
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    parametros = {"horizonte": args.horizonte, "passo": args.passo, "treino_minimo": args.treino_minimo}
+    resumo = buscar(carregar_dados_treino(), carregar_config(), parametros=parametros, processos=args.processos)
+
+    print("🏆 Melhores configurações:")
+    for item in resumo[:5]:
+        print(f"   RMSE {item['rmse']:.4f}  MAPE {item['mape']:.2f}%  {item['prophet']}")
+
+    if args.aplicar:
+        caminho = aplicar_melhor(resumo[0])
+        print(
+            f"✅ Configuração de treino atualizada em {caminho}. "
+            "Execute: python -m operacoes.busca_xgb --aplicar e python -m operacoes.treinar"
+        )
+
+
+if __name__ == "__main__":
+    main()
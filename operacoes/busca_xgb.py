@@ -0,0 +1,229 @@
+"""
+Busca de hiperparâmetros do XGBoost dos resíduos (profundidade, taxa de aprendizado, árvores e lags).
+
+Uso:
+    python -m operacoes.busca_xgb                      # grade padrão, todos os núcleos
+    python -m operacoes.busca_xgb --processos 8 --threads-xgb 2
+    python -m operacoes.busca_xgb --aplicar            # grava a melhor combinação em modelo/config_treino.json
+
+Cada candidato é avaliado com validação cruzada em ordem temporal (TimeSeriesSplit) sobre a parte de
+treino da série; o conjunto de teste nunca é usado. Os candidatos rodam em um pool de processos e cada
+processo usa `threads_xgb` threads do XGBoost, de modo que processos x threads não passe do número de
+núcleos. Cada tentativa concluída é gravada em uma linha de modelo/buscas/xgb_<chave>.jsonl: se a busca
+for interrompida, rodar o mesmo comando continua de onde parou.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+GRADE_PADRAO = {
+    "max_depth": [3, 4, 6, 8],
+    "learning_rate": [0.03, 0.1, 0.3],
+    "n_estimators": [100, 300, 600],
+    "lags": [3, 7, 14, 30],
+}
+
+DOBRAS_PADRAO = 5
+
+# Estado de cada processo do pool (os resíduos são enviados uma única vez, na inicialização)
+_dados_processo = {}
+
+
+def gerar_candidatos(grade=GRADE_PADRAO):
+    nomes = sorted(grade)
+    return [dict(zip(nomes, valores)) for valores in itertools.product(*(grade[nome] for nome in nomes))]
+
+
+def chave_candidato(candidato):
+    return json.dumps(candidato, sort_keys=True)
+
+
+def distribuir_threads(candidatos, processos=None, threads_xgb=None, nucleos=None):
+    """
+    Divide os núcleos entre processos do pool e threads do XGBoost, sem exceder o total.
+    Com candidatos suficientes para ocupar todos os núcleos, uma thread por processo é o mais eficiente
+    (as árvores pequenas deste problema escalam mal com threads); com poucos candidatos, as threads
+    restantes vão para o XGBoost.
+    """
+    nucleos = nucleos or os.cpu_count()
+    if processos is None and threads_xgb is None:
+        processos = max(1, min(candidatos, nucleos))
+    if processos is None:
+        processos = max(1, min(candidatos, nucleos // threads_xgb))
+    if threads_xgb is None:
+        threads_xgb = max(1, nucleos // processos)
+    return processos, threads_xgb
+
+
+def _inicializar_processo(residuo, datas, config, dobras, linhas, threads_xgb):
+    for variavel in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variavel] = str(threads_xgb)
+    logging.getLogger("xgboost").setLevel(logging.WARNING)
+
+    _dados_processo.update(
+        residuo=residuo,
+        datas=datas,
+        config=config,
+        dobras=dobras,
+        linhas=linhas,
+        threads_xgb=threads_xgb,
+    )
+
+
+def avaliar_candidato(candidato):
+    """RMSE do resíduo previsto em cada dobra da validação temporal."""
+    import xgboost as xgb
+    from operacoes.carregar_modelo import CONFIG_PADRAO
+    from operacoes.features import montar_features
+
+    # Mesmas features do treino, com o número de lags do candidato; todos os candidatos são avaliados
+    # nas mesmas `linhas` finais, independente do histórico que cada um precisa
+    config = {**_dados_processo["config"], "lags": candidato["lags"]}
+    X, y, _ = montar_features(_dados_processo["residuo"], _dados_processo["datas"], config)
+    X, y = X[-_dados_processo["linhas"] :], y[-_dados_processo["linhas"] :]
+    parametros = {k: v for k, v in candidato.items() if k != "lags"}
+
+    inicio = time.perf_counter()
+    rmse_dobras = []
+    for indices_treino, indices_validacao in _dados_processo["dobras"]:
+        modelo = xgb.XGBRegressor(
+            **{**CONFIG_PADRAO["xgboost"], **parametros, "n_jobs": _dados_processo["threads_xgb"]}
+        )
+        modelo.fit(X[indices_treino], y[indices_treino])
+        erro = modelo.predict(X[indices_validacao]) - y[indices_validacao]
+        rmse_dobras.append(float(np.sqrt(np.mean(erro**2))))
+
+    return {
+        "parametros": candidato,
+        "rmse": float(np.mean(rmse_dobras)),
+        "rmse_dobras": rmse_dobras,
+        "duracao_s": round(time.perf_counter() - inicio, 2),
+    }
+
+
+def calcular_residuos(df, config):
+    """Resíduos do Prophet e suas datas na parte de treino da série (o teste fica de fora da busca)."""
+    from operacoes.carregar_modelo import ajustar_prophet, preparar_dados, prever_yhat
+
+    df = preparar_dados(df)
+    df = df.iloc[: int(len(df) * config["proporcao_treino"])]
+    prophet = ajustar_prophet(df, config)
+    return df["y"].to_numpy() - prever_yhat(prophet, df["ds"]), df["ds"].to_numpy()
+
+
+def caminho_tentativas(hash_dados, config, dobras):
+    """Arquivo de tentativas: muda quando os dados, o Prophet, as features, a divisão ou as dobras mudam."""
+    from operacoes.carregar_modelo import MODELO_DIR
+
+    base = {
+        "prophet": config["prophet"],
+        "features": config.get("features"),
+        "proporcao_treino": config["proporcao_treino"],
+        "dobras": dobras,
+    }
+    texto = hash_dados + json.dumps(base, sort_keys=True)
+    chave = hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(MODELO_DIR, "buscas", f"xgb_{chave}.jsonl")
+
+
+def ler_tentativas(caminho):
+    """Tentativas já concluídas, por chave do candidato (linhas truncadas por uma interrupção são ignoradas)."""
+    tentativas = {}
+    if not os.path.exists(caminho):
+        return tentativas
+    with open(caminho, encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            try:
+                tentativa = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            tentativas[chave_candidato(tentativa["parametros"])] = tentativa
+    return tentativas
+
+
+def buscar(df, config, grade=GRADE_PADRAO, dobras=DOBRAS_PADRAO, processos=None, threads_xgb=None):
+    """
+    Executa (ou continua) a busca e retorna as tentativas ordenadas do melhor para o pior RMSE.
+    :param df: DataFrame com "Data" e "Preço (US$)".
+    """
+    from sklearn.model_selection import TimeSeriesSplit
+    from operacoes.armazenamento import versao_dados
+    from operacoes.features import tamanho_historico
+
+    caminho = caminho_tentativas(versao_dados(df), config, dobras)
+    tentativas = ler_tentativas(caminho)
+    candidatos = [c for c in gerar_candidatos(grade) if chave_candidato(c) not in tentativas]
+    print(f"🔎 {len(tentativas)} tentativas já concluídas, {len(candidatos)} pendentes ({caminho})")
+
+    if candidatos:
+        residuo, datas = calcular_residuos(df, config)
+        linhas = len(residuo) - max(tamanho_historico({**config, "lags": lags}) for lags in grade["lags"])
+        divisoes = list(TimeSeriesSplit(n_splits=dobras).split(np.arange(linhas)))
+
+        processos, threads_xgb = distribuir_threads(len(candidatos), processos, threads_xgb)
+        print(f"⚙️ {processos} processos x {threads_xgb} threads do XGBoost")
+
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        inicio = time.perf_counter()
+        with open(caminho, "a", encoding="utf-8") as arquivo, ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_inicializar_processo,
+            initargs=(residuo, datas, config, divisoes, linhas, threads_xgb),
+        ) as executor:
+            futuros = [executor.submit(avaliar_candidato, candidato) for candidato in candidatos]
+            for numero, futuro in enumerate(as_completed(futuros), start=1):
+                tentativa = futuro.result()
+                # Uma linha por tentativa, gravada assim que termina
+                arquivo.write(json.dumps(tentativa) + "\n")
+                arquivo.flush()
+                tentativas[chave_candidato(tentativa["parametros"])] = tentativa
+                if numero % 10 == 0 or numero == len(candidatos):
+                    print(f"   {numero}/{len(candidatos)} em {time.perf_counter() - inicio:.1f} s")
+
+    validas = [tentativas[chave_candidato(c)] for c in gerar_candidatos(grade)]
+    return sorted(validas, key=lambda tentativa: tentativa["rmse"])
+
+
+def aplicar_melhor(tentativa):
+    """Grava a melhor combinação na configuração de treino usada por python -m operacoes.treinar."""
+    from operacoes.carregar_modelo import salvar_ajustes
+
+    # Só os valores buscados; os demais parâmetros do XGBoost continuam vindo do CONFIG_PADRAO
+    parametros = dict(tentativa["parametros"])
+    lags = parametros.pop("lags")
+    return salvar_ajustes(xgboost=parametros, lags=lags)
+
+
+def main():
+    from operacoes.carregar_modelo import carregar_config
+    from operacoes.treinar import carregar_dados_treino
+
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do XGBoost dos resíduos.")
+    parser.add_argument("--dobras", type=int, default=DOBRAS_PADRAO, help="Dobras da validação temporal.")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool.")
+    parser.add_argument("--threads-xgb", type=int, default=None, help="Threads do XGBoost por processo.")
+    parser.add_argument("--aplicar", action="store_true", help="Grava o melhor candidato em modelo/config_treino.json.")
+    args = parser.parse_args()
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    tentativas = buscar(
+        carregar_dados_treino(), carregar_config(), dobras=args.dobras, processos=args.processos, threads_xgb=args.threads_xgb
+    )
+
+    print("🏆 Melhores combinações:")
+    for tentativa in tentativas[:5]:
+        print(f"   RMSE {tentativa['rmse']:.4f}  {tentativa['parametros']}")
+
+    if args.aplicar:
+        caminho = aplicar_melhor(tentativas[0])
+        print(f"✅ Configuração de treino atualizada em {caminho}. Execute: python -m operacoes.treinar")
+
+
+if __name__ == "__main__":
+    main()
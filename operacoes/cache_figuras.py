@@ -0,0 +1,51 @@
+"""
+Cache das figuras do Plotly compartilhado pelo processo, com descarte das menos usadas (LRU).
+
+Cada figura é guardada já serializada (o JSON do Plotly), pela versão dos dados, pelo nome do gráfico
+e pelos parâmetros que a alteram (por exemplo o período selecionado). Enquanto nada disso muda, as
+execuções da página (inclusive as disparadas por outros widgets) não montam a figura de novo: o JSON
+é convertido em um dicionário, que o st.plotly_chart aceita diretamente. Cada chamada recebe o seu
+próprio dicionário, de modo que uma sessão não altera a figura de outra.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+MAXIMO_FIGURAS = 64
+
+_figuras = OrderedDict()  # (versao, nome, parametros) -> JSON da figura
+_trava = threading.Lock()
+
+
+def obter_figura(versao, nome, construir, **parametros):
+    """
+    Figura (dicionário do Plotly) do cache ou montada por `construir` na primeira vez.
+    :param versao: Versão dos dados usados na figura.
+    :param construir: Função sem argumentos que retorna a go.Figure.
+    :param parametros: Demais valores de que a figura depende.
+    """
+    chave = (versao, nome, json.dumps(parametros, sort_keys=True, default=str))
+    with _trava:
+        texto = _figuras.get(chave)
+        if texto is not None:
+            _figuras.move_to_end(chave)
+            return json.loads(texto)
+
+    texto = construir().to_json()
+    with _trava:
+        _figuras[chave] = texto
+        _figuras.move_to_end(chave)
+        while len(_figuras) > MAXIMO_FIGURAS:
+            _figuras.popitem(last=False)
+    return json.loads(texto)
+
+
+def descartar(versao=None):
+    """
+    Remove do cache as figuras da versão informada (todas, por padrão). Chamada por
+    agregados.obter_agregados quando surge uma nova versão dos dados.
+    """
+    with _trava:
+        for chave in [c for c in _figuras if versao is None or c[0] == versao]:
+            del _figuras[chave]
+
@@ -0,0 +1,61 @@
+"""
+Cache de artefatos (modelos, parquets, cubo de previsões) compartilhado pelo processo inteiro: todas as
+sessões e threads do servidor do Streamlit usam a mesma cópia em memória.
+
+A chave é o caminho do arquivo; junto fica a assinatura (mtime em ns e tamanho). Enquanto o arquivo não
+muda, o objeto carregado é reaproveitado; se o arquivo for regravado, a próxima leitura carrega de novo.
+Leituras simultâneas do mesmo arquivo esperam um único carregamento.
+
+Cada treino publica os artefatos em um diretório novo; para que as versões antigas não fiquem na
+memória do servidor para sempre, o cache guarda no máximo MAXIMO_ARTEFATOS arquivos e descarta os
+usados há mais tempo (LRU).
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# Modelos, tabelas, cubo e pacote de inferência da versão atual e de uma versão anterior
+MAXIMO_ARTEFATOS = 12
+
+_cache = OrderedDict()  # caminho -> (assinatura, objeto)
+_travas_caminho = {}
+_trava = threading.Lock()
+
+
+def assinatura(caminho):
+    info = os.stat(caminho)
+    return info.st_mtime_ns, info.st_size
+
+
+def carregar(caminho, carregador):
+    """
+    Objeto do arquivo, carregado uma única vez por versão do arquivo.
+    :param carregador: Função que recebe o caminho e retorna o objeto (por exemplo pd.read_parquet).
+    """
+    caminho = os.path.abspath(caminho)
+    atual = assinatura(caminho)
+
+    with _trava:
+        item = _cache.get(caminho)
+        if item is not None and item[0] == atual:
+            _cache.move_to_end(caminho)
+            return item[1]
+        trava_caminho = _travas_caminho.setdefault(caminho, threading.Lock())
+
+    with trava_caminho:
+        # Outra thread pode ter carregado enquanto esta esperava
+        with _trava:
+            item = _cache.get(caminho)
+            if item is not None and item[0] == atual:
+                _cache.move_to_end(caminho)
+                return item[1]
+
+        objeto = carregador(caminho)
+        with _trava:
+            _cache[caminho] = (atual, objeto)
+            _cache.move_to_end(caminho)
+            while len(_cache) > MAXIMO_ARTEFATOS:
+                antigo, _ = _cache.popitem(last=False)
+                _travas_caminho.pop(antigo, None)
+        return objeto
+
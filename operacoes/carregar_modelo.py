@@ -1,40 +1,116 @@
 import pandas as pd
-from prophet import Prophet
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-from sklearn.model_selection import train_test_split
-from operacoes.carregar_tabela import carregar_base_dados
-import xgboost as xgb
-import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datetime import datetime, date
+from datetime import datetime
+import hashlib
+import json
 import os
-import joblib
-import streamlit as st
-
-
-@st.cache_data
-# Função para carregar os dados e treinar os modelos
-def carregar_e_treinar_modelos():
+import shutil
+from operacoes import cache_modelos, formato_modelos, inferencia
+from operacoes.gravacao import arquivo_atomico, diretorio_temporario, publicar_diretorio
+from operacoes.registro import (
+    MODELO_DIR,
+    ler_manifesto,
+    diretorio_versao,
+    buscar_versao,
+    novo_diretorio,
+    registrar_versao,
+    trava_treino,
+)
+from operacoes.prophet_rapido import ProphetRapido
+from operacoes.features import montar_features, nomes_features, tamanho_historico
+from operacoes.previsao_residuos import obter_booster, prever_residuos_diarios
+from functools import partial
+
+
+# Ajustes sobre a configuração padrão gravados pelas buscas de hiperparâmetros (operacoes.busca_xgb)
+CAMINHO_CONFIG_TREINO = os.path.join(MODELO_DIR, "config_treino.json")
+
+# Modelos em formato nativo (JSON do Prophet e UBJSON do XGBoost); os pickles são das versões antigas
+ARQUIVO_PROPHET_JSON = formato_modelos.ARQUIVO_PROPHET_JSON
+ARQUIVO_XGB_UBJ = formato_modelos.ARQUIVO_XGB_UBJ
+ARQUIVO_PROPHET = formato_modelos.ARQUIVO_PROPHET_PICKLE
+ARQUIVO_XGB = "modelo_xgboost.pkl"
+ARQUIVO_HISTORICO = "historico.parquet"
+ARQUIVO_PREVISAO_PROPHET = "previsao_prophet.parquet"
+# Previsão ajustada (Prophet + resíduo do XGBoost) de cada dia até a data final, com os limites
+ARQUIVO_CUBO = "previsoes.npz"
+
+# Definir a data final desejada (31 de dezembro de 2026)
+DATA_FINAL_PREVISAO = pd.to_datetime("2026-12-31")
+
+# Revisão do código de treino: mudar o que treinar_modelos produz com os mesmos dados e a mesma
+# configuração exige incrementá-la, para que o treino não reaproveite os artefatos antigos
+# (2: histórico completo, sem cortar as primeiras linhas sem features; 3: rollout do cubo em dias úteis)
+REVISAO_TREINO = 3
+
+# Configuração do treino; junto com o hash dos dados, identifica a versão dos artefatos
+CONFIG_PADRAO = {
+    "prophet": {},
+    "xgboost": {"objective": "reg:squarederror", "n_estimators": 100, "learning_rate": 0.1, "random_state": 42},
+    "lags": 7,
+    # Janelas móveis (média, desvio, mínimo e máximo) e campos de calendário (ver operacoes.features)
+    "features": {
+        "janelas": [21, 252],
+        "estatisticas": ["media", "desvio", "minimo", "maximo"],
+        "calendario": ["ano", "mes", "dia", "dia_semana"],
+    },
+    "proporcao_treino": 0.8,
+    "data_final": DATA_FINAL_PREVISAO.strftime("%Y-%m-%d"),
+}
+
+
+# Chaves ajustadas pelas buscas (busca_xgb e busca_prophet); o restante vem sempre do CONFIG_PADRAO
+CHAVES_AJUSTAVEIS = ("xgboost", "lags", "prophet")
+
+
+def _mesclar(padrao, ajustes):
+    """Aplica os ajustes sobre a configuração padrão, mesclando os dicionários aninhados."""
+    config = dict(padrao)
+    for chave, valor in ajustes.items():
+        if isinstance(valor, dict) and isinstance(config.get(chave), dict):
+            valor = _mesclar(config[chave], valor)
+        config[chave] = valor
+    return config
+
+
+def ler_ajustes():
+    """Ajustes gravados em modelo/config_treino.json (só as CHAVES_AJUSTAVEIS)."""
     try:
-        # Tenta carregar os dados do arquivo local
-        df = pd.read_csv("dados/dados_petroleo_brent_2005_2025.csv")
-        # st.success("✅ Dados carregados com sucesso do arquivo local.")
-    
+        with open(CAMINHO_CONFIG_TREINO, encoding="utf-8") as arquivo:
+            ajustes = json.load(arquivo)
     except FileNotFoundError:
-        st.warning("⚠️ Arquivo local não encontrado. Tentando carregar da base de dados online...")
-        try:
-            df = carregar_base_dados()
-            # st.success("✅ Dados carregados com sucesso da base de dados online.")
-        except Exception as e:
-            st.error(f"❌ Erro ao carregar os dados online: {e}")
-            return None, None, None, None, None
+        return {}
+    # Arquivos antigos guardavam a configuração inteira; as demais chaves seguem o CONFIG_PADRAO
+    return {chave: valor for chave, valor in ajustes.items() if chave in CHAVES_AJUSTAVEIS}
+
+
+def carregar_config():
+    """Configuração de treino: a padrão, com os ajustes de modelo/config_treino.json mesclados."""
+    return _mesclar(CONFIG_PADRAO, ler_ajustes())
+
+
+def salvar_ajustes(**ajustes):
+    """
+    Grava em modelo/config_treino.json apenas os ajustes informados (por exemplo xgboost=..., lags=...),
+    que substituem os gravados antes para as mesmas chaves. Mudanças futuras nos demais valores do
+    CONFIG_PADRAO (inclusive os parâmetros do XGBoost que não foram buscados) continuam valendo.
+    """
+    invalidas = set(ajustes) - set(CHAVES_AJUSTAVEIS)
+    if invalidas:
+        raise ValueError(f"Chaves não ajustáveis: {sorted(invalidas)}")
+
+    with arquivo_atomico(CAMINHO_CONFIG_TREINO, "w", encoding="utf-8") as arquivo:
+        json.dump({**ler_ajustes(), **ajustes}, arquivo, indent=2, ensure_ascii=False)
+    return CAMINHO_CONFIG_TREINO
 
+
+def preparar_dados(df):
+    """Valida e limpa a série ("Data", "Preço (US$)") e devolve as colunas "ds" e "y" do Prophet."""
     # Verificar colunas esperadas
     if "Data" not in df.columns or "Preço (US$)" not in df.columns:
-        st.error("O arquivo CSV deve conter as colunas 'Data' e 'Preço (US$)'.")
-        return None, None, None, None, None
+        raise ValueError("Os dados devem conter as colunas 'Data' e 'Preço (US$)'.")
+
+    df = df.copy()
 
     # Converter colunas para os tipos corretos
     df["ds"] = pd.to_datetime(df["Data"], errors="coerce")  # Converte para datetime
@@ -42,39 +118,123 @@ def carregar_e_treinar_modelos():
 
     # Verificar valores ausentes
     if df["ds"].isnull().any() or df["y"].isnull().any():
-        st.warning("⚠️ Atenção: Há valores ausentes nas colunas 'Data' ou 'Preço (US$)'. Preenchendo valores ausentes...")
-        df["ds"].fillna(method="ffill", inplace=True)  # Preenche datas ausentes
-        df["y"].fillna(method="ffill", inplace=True)  # Preenche preços ausentes
+        print("⚠️ Atenção: Há valores ausentes nas colunas 'Data' ou 'Preço (US$)'. Preenchendo valores ausentes...")
+        df["ds"] = df["ds"].ffill()  # Preenche datas ausentes
+        df["y"] = df["y"].ffill()  # Preenche preços ausentes
 
     # Ordenar os dados corretamente
     df = df.sort_values(by="ds").reset_index(drop=True)
 
     # Verificar e remover duplicatas na coluna 'ds' (Data)
     if df.duplicated(subset=["ds"]).any():
-        st.warning("⚠️ Atenção: Há duplicatas na coluna 'Data'. Removendo duplicatas...")
+        print("⚠️ Atenção: Há duplicatas na coluna 'Data'. Removendo duplicatas...")
         df = df.drop_duplicates(subset=["ds"])
 
-    # Treinar o modelo Prophet
-    prophet = Prophet()
-    prophet.fit(df[["ds", "y"]])  # Usando apenas as colunas 'ds' e 'y'
+    return df
+
+
+def parametros_iniciais(prophet):
+    """
+    Parâmetros ajustados (k, m, delta, beta, sigma_obs) de um Prophet já treinado, no formato
+    aceito por Prophet.fit(init=...) para iniciar o otimizador do Stan a partir deles (warm start).
+    """
+    iniciais = {}
+    for nome in ["k", "m", "sigma_obs"]:
+        if prophet.mcmc_samples == 0:
+            iniciais[nome] = prophet.params[nome][0][0]
+        else:
+            iniciais[nome] = np.mean(prophet.params[nome])
+    for nome in ["delta", "beta"]:
+        if prophet.mcmc_samples == 0:
+            iniciais[nome] = prophet.params[nome][0]
+        else:
+            iniciais[nome] = np.mean(prophet.params[nome], axis=0)
+    return iniciais
+
+
+def ajustar_prophet(df, config=CONFIG_PADRAO, prophet_anterior=None):
+    """
+    Treina o Prophet nas colunas "ds" e "y".
+    :param prophet_anterior: Modelo treinado com a mesma configuração em uma versão anterior dos
+        dados; quando informado, o otimizador parte dos parâmetros dele em vez de começar do zero.
+    """
+    from prophet import Prophet  # só o treino precisa do Prophet completo (o dashboard lê os parquets)
 
-    # Definir a data final desejada (31 de dezembro de 2026)
-    data_final_desejada = pd.to_datetime("2026-12-31")
+    prophet = Prophet(**config["prophet"])
+    if prophet_anterior is None:
+        prophet.fit(df[["ds", "y"]])  # Usando apenas as colunas 'ds' e 'y'
+    else:
+        prophet.fit(df[["ds", "y"]], init=parametros_iniciais(prophet_anterior))
+    return prophet
+
+
+def prever_yhat(prophet, datas):
+    """yhat do Prophet para as datas, sem a amostragem de incerteza (bem mais rápido que o predict completo)."""
+    try:
+        return ProphetRapido(prophet).prever_yhat(datas)
+    except ValueError:
+        # Configuração não suportada pela inferência rápida: predict sem amostragem
+        amostras, prophet.uncertainty_samples = prophet.uncertainty_samples, 0
+        try:
+            return prophet.predict(pd.DataFrame({"ds": pd.to_datetime(datas)}))["yhat"].to_numpy()
+        finally:
+            prophet.uncertainty_samples = amostras
+
+
+def prever_prophet(prophet, datas, data_final):
+    """
+    Previsão com intervalos para as datas: inferência rápida (componentes pré-calculados e intervalos
+    calibrados por horizonte) ou, se a configuração não for suportada, o predict completo.
+    """
+    try:
+        return ProphetRapido.calibrar(prophet, data_final).prever(datas)
+    except ValueError:
+        return prophet.predict(pd.DataFrame({"ds": pd.to_datetime(datas)}))
+
+
+def comparar_prophets(prophet_quente, prophet_frio, df):
+    """
+    Compara o ajuste com warm start contra o ajuste do zero no histórico.
+    :return: Dicionário com o RMSE no histórico de cada ajuste e a maior diferença entre os yhat,
+        relativa ao preço médio.
+    """
+    real = df["y"].to_numpy()
+    yhat_quente = prever_yhat(prophet_quente, df["ds"])
+    yhat_frio = prever_yhat(prophet_frio, df["ds"])
+
+    return {
+        "rmse_quente": float(np.sqrt(np.mean((yhat_quente - real) ** 2))),
+        "rmse_frio": float(np.sqrt(np.mean((yhat_frio - real) ** 2))),
+        "diferenca_max_yhat": float(np.max(np.abs(yhat_quente - yhat_frio)) / np.mean(np.abs(real))),
+    }
+
+
+# Função para treinar os modelos (usada apenas pelo treino offline, nunca em uma requisição)
+def treinar_modelos(df, config=CONFIG_PADRAO, prophet_anterior=None, prophet=None):
+    """
+    :param prophet_anterior: Prophet da versão anterior, para o warm start do ajuste.
+    :param prophet: Prophet já ajustado nesses dados (pula o ajuste).
+    """
+    df = preparar_dados(df)
+
+    # Treinar o modelo Prophet
+    if prophet is None:
+        prophet = ajustar_prophet(df, config, prophet_anterior)
 
     # Calcular o número de dias até a data final desejada
     ultima_data_df = df["ds"].max()
-    dias_ate_2026 = (data_final_desejada - ultima_data_df).days
+    dias_ate_2026 = (pd.to_datetime(config["data_final"]) - ultima_data_df).days
 
     # Criar previsões do Prophet até o final de 2026
     future = prophet.make_future_dataframe(periods=dias_ate_2026)  # Previsão até 31 de dezembro de 2026
-    prophet_future = prophet.predict(future)
+    prophet_future = prever_prophet(prophet, future["ds"], config["data_final"])
 
     # Mesclar previsões do Prophet com o DataFrame original
     df = df.merge(prophet_future[["ds", "yhat", "yhat_lower", "yhat_upper"]], on="ds", how="left")
 
     # Verificar duplicatas após a mesclagem
     if df.duplicated(subset=["ds"]).any():
-        st.warning("⚠️ Atenção: Há duplicatas após a mesclagem. Removendo duplicatas...")
+        print("⚠️ Atenção: Há duplicatas após a mesclagem. Removendo duplicatas...")
         df = df.drop_duplicates(subset=["ds"])
 
     # Renomear as colunas de forma clara e estruturada
@@ -86,127 +246,278 @@ def carregar_e_treinar_modelos():
     # Calcular resíduos (erros) do Prophet
     df["Resíduo"] = df["Preço Real"] - df["US$ Preço Previsto"]
 
-    # Criar features para o modelo XGBoost
-    for i in range(1, 8):  # Criar lags de 1 a 7 dias
-        df[f"Resíduo_Lag_{i}"] = df["Resíduo"].shift(i)
+    # Criar features para o modelo XGBoost (lags, janelas móveis e calendário, em uma matriz float32)
+    X, y, _ = montar_features(df["Resíduo"], df["Data"], config)
 
-    # Remover linhas com valores ausentes gerados pelos lags
-    df.dropna(inplace=True)
+    # As primeiras linhas não têm resíduos anteriores suficientes para as features: continuam no
+    # histórico (preço real e Prophet), com as features vazias, e ficam fora do treino do XGBoost
+    features = nomes_features(config)
+    matriz = np.full((len(df), len(features)), np.nan, dtype=np.float32)
+    matriz[tamanho_historico(config):] = X
+    df = pd.concat([df.reset_index(drop=True), pd.DataFrame(matriz, columns=features)], axis=1)
+    modelo = df[df[features].notna().all(axis=1)]
 
-    # Dividir os dados em treino e teste
-    train_size = int(len(df) * 0.8)  # 80% para treino, 20% para teste
-    train = df.iloc[:train_size]
-    test = df.iloc[train_size:]
+    # Dividir as linhas com features em treino e teste (o teste é o fim do histórico)
+    train_size = int(len(modelo) * config["proporcao_treino"])  # 80% para treino, 20% para teste
+    train = modelo.iloc[:train_size]
+    test = modelo.iloc[train_size:]
 
     # Definir features e target para o XGBoost
-    features = [f"Resíduo_Lag_{i}" for i in range(1, 8)]  # Usar os lags como features
-    X_train, y_train = train[features], train["Resíduo"]
-    X_test, y_test = test[features], test["Resíduo"]
+    X_train, y_train = train[features].to_numpy(np.float32), train["Resíduo"].to_numpy(np.float32)
+
+    # Treinar o modelo XGBoost (importado só aqui: o dashboard não carrega o XGBoost)
+    import xgboost as xgb
 
-    # Treinar o modelo XGBoost
-    model_xgb = xgb.XGBRegressor(objective="reg:squarederror", n_estimators=100, learning_rate=0.1, random_state=42)
+    model_xgb = xgb.XGBRegressor(**config["xgboost"])
     model_xgb.fit(X_train, y_train)
 
-    # Definir o diretório onde os modelos serão salvos
-    modelo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "modelo"))
+    return df, prophet, model_xgb, test, prophet_future
 
-    # Criar diretório caso não exista
-    if not os.path.exists(modelo_dir):
-        os.makedirs(modelo_dir)
 
-    # Caminhos completos para os arquivos de modelo
-    modelo_prophet_path = os.path.join(modelo_dir, "modelo_prophet.pkl")
-    modelo_xgb_path = os.path.join(modelo_dir, "modelo_xgboost.pkl")
+def calcular_metricas(real, previsto):
+    real = np.asarray(real, dtype=float)
+    previsto = np.asarray(previsto, dtype=float)
+    return {
+        "rmse": float(np.sqrt(np.mean((real - previsto) ** 2))),
+        "mae": float(np.mean(np.abs(real - previsto))),
+        "mape": float(np.mean(np.abs((real - previsto) / real)) * 100),
+    }
 
-    # Salvar os modelos treinados
-    joblib.dump(prophet, modelo_prophet_path)
-    joblib.dump(model_xgb, modelo_xgb_path)
-    print(f"✅ Modelos salvos com sucesso em: {modelo_dir}")
 
-    return df, prophet, model_xgb, test, prophet_future
+def avaliar_modelos(model_xgb, test, config=CONFIG_PADRAO):
+    """Métricas do modelo ajustado (Prophet + resíduo previsto pelo XGBoost) no conjunto de teste."""
+    residuo_previsto = model_xgb.predict(test[nomes_features(config)].to_numpy(np.float32))
+    previsto = test["US$ Preço Previsto"].to_numpy() + residuo_previsto
+    return calcular_metricas(test["Preço Real"], previsto)
 
 
-# Função para criar tabela de previsões
+def chave_versao(hash_dados, config=CONFIG_PADRAO):
+    """
+    Chave da versão: hash da série de entrada combinado com o hash da configuração de treino e com a
+    revisão do treino (REVISAO_TREINO).
+    """
+    texto_config = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256((hash_dados + texto_config + str(REVISAO_TREINO)).encode("utf-8")).hexdigest()[:16]
 
 
-def criar_tabela_previsoes(data_inicio, dias_futuros, df_inicial):
+def salvar_artefatos(versao, df, prophet, model_xgb, test, prophet_future, metadados=None, formato_prophet="json"):
     """
-    Função para criar uma tabela de previsões a partir de uma data específica.
-    :param data_inicio: Data inicial no formato 'YYYY-MM-DD'.
-    :param dias_futuros: Número de dias para prever no futuro.
-    :param df_inicial: DataFrame inicial com os dados históricos.
-    :return: DataFrame com as previsões.
-    # Obter o diretório do script atual"""
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "modelo"))
+    Grava os artefatos da versão em um diretório novo de modelo/versoes/ e a torna a versão atual.
+    :param formato_prophet: "json" (padrão) ou "pickle", que carrega mais rápido (ver formato_modelos).
+    """
+    diretorio = novo_diretorio(versao)
+    arquivo_prophet, salvar_prophet = formato_modelos.FORMATOS_PROPHET[formato_prophet]
 
+    # Os artefatos são montados em um diretório temporário e publicados juntos, com uma renomeação:
+    # quem lê a versão nunca encontra arquivos pela metade nem modelos novos misturados com antigos
+    temporario = diretorio_temporario(diretorio)
+    try:
+        # Salvar os modelos treinados (com checksum) e os dados usados pelo dashboard
+        checksums = {
+            arquivo_prophet: salvar_prophet(prophet, os.path.join(temporario, arquivo_prophet)),
+            ARQUIVO_XGB_UBJ: formato_modelos.salvar_xgb(model_xgb, os.path.join(temporario, ARQUIVO_XGB_UBJ)),
+        }
+        df.to_parquet(os.path.join(temporario, ARQUIVO_HISTORICO), index=False)
+        prophet_future.to_parquet(os.path.join(temporario, ARQUIVO_PREVISAO_PROPHET), index=False)
+        config = (metadados or {}).get("config", CONFIG_PADRAO)
+        salvar_cubo(temporario, gerar_cubo_previsoes(df, model_xgb, prophet_future, config))
+
+        # Pacote de inferência: estado do resíduo e Prophet pré-calculado, para prever sem o histórico
+        try:
+            pacote = inferencia.criar_pacote(df, prophet, prophet_future, config, checksums[ARQUIVO_XGB_UBJ])
+            checksums[inferencia.ARQUIVO_PACOTE] = inferencia.salvar_pacote(temporario, pacote)
+        except ValueError as erro:
+            print(f"⚠️ Atenção: pacote de inferência não gerado ({erro})")
+    except BaseException:
+        shutil.rmtree(temporario, ignore_errors=True)
+        raise
+
+    metadados = {
+        **(metadados or {}),
+        "criado_em": datetime.now().isoformat(timespec="seconds"),
+        "ultima_data": df["Data"].max().strftime("%Y-%m-%d"),
+        "linhas": len(df),
+        "linhas_treino": len(df) - len(test),
+        "checksums": checksums,
+    }
+
+    # Publicação: o diretório novo e, logo em seguida, o manifesto que aponta para ele (gravado de forma
+    # atômica). Um diretório anterior da mesma versão (--forcar) continua intacto para quem o está lendo
+    publicar_diretorio(temporario, diretorio)
+    registrar_versao(versao, diretorio, metadados)
+
+    print(f"✅ Modelos salvos com sucesso em: {diretorio}")
+    return versao
+
+
+def carregar_prophet_anterior(config=CONFIG_PADRAO):
+    """Prophet da versão atual, se ela foi treinada com a mesma configuração do Prophet (para warm start)."""
+    manifesto = ler_manifesto()
+    versao = manifesto["atual"]
+    if versao is None or buscar_versao(versao) is None:
+        return None
+    if manifesto["versoes"][versao].get("config", {}).get("prophet") != config["prophet"]:
+        return None
+    return carregar_modelo_versao(diretorio_versao(versao, manifesto), manifesto["versoes"][versao], "prophet")
+
+
+def carregar_modelo_versao(diretorio, metadados, modelo):
+    """
+    Prophet ou XGBoost da versão, pelo cache do processo.
+    Usa o formato nativo ou, nas versões antigas e no Prophet treinado com --formato-prophet pickle, o
+    pickle (conferindo o checksum do manifesto, quando registrado).
+    :param diretorio: Diretório da versão (diretorio_versao).
+    :param modelo: "prophet" ou "xgboost".
+    """
+    arquivo_nativo, leitor, arquivo_pickle = {
+        "prophet": (ARQUIVO_PROPHET_JSON, formato_modelos.ler_prophet, ARQUIVO_PROPHET),
+        "xgboost": (ARQUIVO_XGB_UBJ, formato_modelos.ler_xgb, ARQUIVO_XGB),
+    }[modelo]
 
-    modelo_prophet_path = os.path.join(base_dir, "modelo_prophet.pkl")
-    modelo_xgb_path = os.path.join(base_dir, "modelo_xgboost.pkl")
+    if not os.path.exists(os.path.join(diretorio, arquivo_nativo)):
+        arquivo_nativo, leitor = arquivo_pickle, formato_modelos.ler_pickle
 
+    checksum = metadados.get("checksums", {}).get(arquivo_nativo)
+    return cache_modelos.carregar(os.path.join(diretorio, arquivo_nativo), partial(leitor, checksum=checksum))
 
-    # Carregar os modelos salvos
-    # Carregar os modelos
-    prophet = joblib.load(modelo_prophet_path)
-    model_xgb = joblib.load(modelo_xgb_path)
 
-    # Criar DataFrame com as datas futuras
-    datas_futuras = pd.date_range(start=data_inicio, periods=dias_futuros, freq="D")
-    future_df = pd.DataFrame({"ds": datas_futuras})
+def _carregar_versao(versao):
+    """Artefatos da versão pelo cache do processo (uma leitura por arquivo, compartilhada entre as sessões)."""
+    # Diretório e metadados da mesma leitura do manifesto
+    manifesto = ler_manifesto()
+    diretorio = diretorio_versao(versao, manifesto)
+    metadados = manifesto["versoes"][versao]
 
-    # Fazer previsões com o Prophet
-    prophet_future = prophet.predict(future_df)
+    prophet = carregar_modelo_versao(diretorio, metadados, "prophet")
+    model_xgb = carregar_modelo_versao(diretorio, metadados, "xgboost")
+    df, prophet_future = _carregar_tabelas(diretorio)
+    test = df.iloc[metadados["linhas_treino"]:]
 
-    # Mesclar previsões do Prophet com o DataFrame futuro
-    future_df = future_df.merge(
-        prophet_future[["ds", "yhat", "yhat_lower", "yhat_upper"]], on="ds", how="left"
-    )
+    return df, prophet, model_xgb, test, prophet_future
 
-    # Calcular resíduos previstos pelo XGBoost
-    ultimos_residuos = df_inicial["Resíduo"].tail(7).values
-    if len(ultimos_residuos) < 7:
-        raise ValueError("Não há dados históricos suficientes para prever o resíduo.")
 
-    # Criar features para o XGBoost
-    features_xgb = {f"Resíduo_Lag_{i+1}": ultimos_residuos[-(i + 1)] for i in range(7)}
-    features_xgb = pd.DataFrame([features_xgb])
+def _carregar_tabelas(diretorio):
+    """Histórico e previsão do Prophet da versão (parquets), pelo cache do processo."""
+    df = cache_modelos.carregar(os.path.join(diretorio, ARQUIVO_HISTORICO), pd.read_parquet)
+    prophet_future = cache_modelos.carregar(os.path.join(diretorio, ARQUIVO_PREVISAO_PROPHET), pd.read_parquet)
+    return df, prophet_future
 
-    # Prever o resíduo com o XGBoost
-    residuo_previsto = model_xgb.predict(features_xgb)[0]
 
-    # Ajustar as previsões do Prophet com o resíduo previsto
-    future_df["US$ Preço Previsto Ajustado"] = future_df["yhat"] + residuo_previsto
-    future_df["US$ Preço Previsto Ajustado Inferior"] = (
-        future_df["yhat_lower"] + residuo_previsto
-    )
-    future_df["US$ Preço Previsto Ajustado Superior"] = (
-        future_df["yhat_upper"] + residuo_previsto
-    )
+def carregar_previsoes():
+    """
+    Só as tabelas da versão atual usadas pelas páginas, sem desserializar os modelos (nem importar o
+    Prophet e o XGBoost).
+    :return: (df, prophet_future), como em carregar_modelos.
+    """
+    df, prophet_future = _carregar_tabelas(diretorio_versao())
+    # Cópias rasas: o cache é compartilhado entre as sessões
+    return df.copy(), prophet_future.copy()
 
-    # Renomear colunas
-    future_df.rename(
-        columns={
-            "ds": "Data",
-            "US$ Preço Previsto Ajustado": "US$ Preço Previsto",
-            "US$ Preço Previsto Ajustado Inferior": "US$ Estimativa de Preço Mínima",
-            "US$ Preço Previsto Ajustado Superior": "US$ Estimativa de Preço Máxima",
-        },
-        inplace=True,
-    )
 
-    # Formatar a coluna "Data" para o padrão brasileiro (dia/mês/ano)
-    future_df["Data"] = future_df["Data"].dt.strftime("%Y/%m/%d")
+# Função para carregar os modelos já treinados (o dashboard nunca treina)
+def carregar_modelos():
+    """
+    Carrega os artefatos da versão atual em modelo/.
+    :return: (df, prophet, model_xgb, test, prophet_future), como gerados por treinar_modelos.
+    """
+    versao = ler_manifesto()["atual"]
+    if versao is None:
+        diretorio_versao()  # levanta FileNotFoundError com a instrução de treino
+    df, prophet, model_xgb, test, prophet_future = _carregar_versao(versao)
+    # Cópias rasas: o cache é compartilhado entre as sessões
+    return df.copy(), prophet, model_xgb, test, prophet_future.copy()
+
+
+def gerar_cubo_previsoes(df, model_xgb, prophet_future, config=CONFIG_PADRAO):
+    """
+    Materializa a previsão ajustada de todas as datas da previsão do Prophet (histórico e futuro até a
+    data final), para que a tabela de previsões seja só um recorte.
+    :return: Dicionário de arrays: "inicio" (1ª data), "previsto", "minimo" e "maximo" (float32, um por dia).
+    """
+    # Uma linha por dia, sem lacunas, para que a posição de cada data seja (data - inicio) em dias
+    previsao = prophet_future.set_index(pd.to_datetime(prophet_future["ds"]))
+    previsao = previsao[["yhat", "yhat_lower", "yhat_upper"]].sort_index()
+    previsao = previsao.reindex(pd.date_range(previsao.index[0], previsao.index[-1], freq="D")).interpolate()
+
+    # Resíduo previsto pelo XGBoost para cada data, com as mesmas features do treino:
+    # no futuro, rollout recursivo nos dias úteis a partir do fim do histórico (os fins de semana
+    # repetem o último dia útil); no histórico, previsão um passo à frente
+    residuo_previsto = np.zeros(len(previsao), dtype=np.float32)
+    futuro = previsao.index > df["Data"].max()
+    residuo_previsto[futuro] = prever_residuos_diarios(model_xgb, df["Resíduo"], previsao.index[futuro], config)
+
+    # As primeiras datas do histórico, sem features, ficam só com o Prophet (resíduo 0)
+    com_features = df[df[nomes_features(config)].notna().all(axis=1)]
+    um_passo = obter_booster(model_xgb).inplace_predict(com_features[nomes_features(config)].to_numpy(np.float32))
+    um_passo = pd.Series(um_passo, index=pd.to_datetime(com_features["Data"]))
+    residuo_previsto[~futuro] = um_passo.reindex(previsao.index[~futuro]).interpolate(limit_area="inside").fillna(0)
+
+    return {
+        "inicio": np.datetime64(previsao.index[0].date(), "D"),
+        "previsto": (previsao["yhat"].to_numpy() + residuo_previsto).astype(np.float32),
+        "minimo": (previsao["yhat_lower"].to_numpy() + residuo_previsto).astype(np.float32),
+        "maximo": (previsao["yhat_upper"].to_numpy() + residuo_previsto).astype(np.float32),
+    }
+
+
+def salvar_cubo(diretorio, cubo):
+    with arquivo_atomico(os.path.join(diretorio, ARQUIVO_CUBO)) as arquivo:
+        np.savez(arquivo, **cubo)
+
+
+def ler_cubo(caminho):
+    with np.load(caminho) as arquivo:
+        return {nome: arquivo[nome] for nome in arquivo.files}
+
+
+def _carregar_cubo(versao):
+    caminho = os.path.join(diretorio_versao(versao), ARQUIVO_CUBO)
+    if not os.path.exists(caminho):
+        # Versão treinada antes do cubo: gera a partir dos artefatos e grava para as próximas vezes.
+        # Sob a trava do treino, para não gravar em um diretório que o treino está publicando ou removendo
+        with trava_treino():
+            manifesto = ler_manifesto()
+            caminho = os.path.join(diretorio_versao(versao, manifesto), ARQUIVO_CUBO)
+            if not os.path.exists(caminho):
+                df, prophet, model_xgb, test, prophet_future = _carregar_versao(versao)
+                config = manifesto["versoes"][versao].get("config", CONFIG_PADRAO)
+                salvar_cubo(os.path.dirname(caminho), gerar_cubo_previsoes(df, model_xgb, prophet_future, config))
+
+    return cache_modelos.carregar(caminho, ler_cubo)
 
-    # Arredondar os valores para 2 casas decimais
-    future_df = future_df.round(2)
 
-    # Selecionar colunas relevantes
-    tabela_previsoes = future_df[
-        [
-            "Data",
-            "US$ Preço Previsto",
-            "US$ Estimativa de Preço Mínima",
-            "US$ Estimativa de Preço Máxima",
-        ]
-    ]
+# Função para criar tabela de previsões
+def criar_tabela_previsoes(data_inicio, dias_futuros, df_inicial=None):
+    """
+    Função para criar uma tabela de previsões a partir de uma data específica.
+    As previsões são recortadas do cubo gerado no treino (modelo/versoes/<versao>/previsoes.npz).
+    :param data_inicio: Data inicial no formato 'YYYY-MM-DD'.
+    :param dias_futuros: Número de dias para prever no futuro.
+    :param df_inicial: Não é mais usado (o resíduo já foi aplicado no treino); mantido por compatibilidade.
+    :return: DataFrame com as previsões.
+    """
+    versao = ler_manifesto()["atual"]
+    if versao is None:
+        diretorio_versao()  # levanta FileNotFoundError com a instrução de treino
+    cubo = _carregar_cubo(versao)
+
+    # Posição da data inicial no cubo
+    inicio = int((np.datetime64(data_inicio, "D") - cubo["inicio"]).astype(int))
+    fim = inicio + int(dias_futuros)
+    if inicio < 0 or fim > len(cubo["previsto"]):
+        ultima_data = cubo["inicio"] + len(cubo["previsto"]) - 1
+        raise ValueError(f"As previsões estão disponíveis de {cubo['inicio']} até {ultima_data}.")
+
+    datas = pd.date_range(start=data_inicio, periods=dias_futuros, freq="D")
+
+    # Formatar a coluna "Data" e arredondar os valores para 2 casas decimais
+    tabela_previsoes = pd.DataFrame(
+        {
+            "Data": datas.strftime("%Y/%m/%d"),
+            "US$ Preço Previsto": np.round(cubo["previsto"][inicio:fim].astype(np.float64), 2),
+            "US$ Estimativa de Preço Mínima": np.round(cubo["minimo"][inicio:fim].astype(np.float64), 2),
+            "US$ Estimativa de Preço Máxima": np.round(cubo["maximo"][inicio:fim].astype(np.float64), 2),
+        }
+    )
 
-    return tabela_previsoes
\ No newline at end of file
+    return tabela_previsoes
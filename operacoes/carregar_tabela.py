@@ -1,59 +1,220 @@
-import requests
 import streamlit as st
 import pandas as pd
-from bs4 import BeautifulSoup
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operacoes.armazenamento import (
+    DIRETORIO_DADOS,
+    CAMINHO_CSV,
+    CAMINHO_PARQUET,
+    COLUNA_PRECO,
+    acrescentar_dados,
+    ler_dados,
+    salvar_dados,
+)
+from operacoes.cliente_ipea import obter_cliente
+from operacoes.gravacao import arquivo_atomico
+from operacoes.parser_ipea import extrair_serie, serie_para_dataframe
 
-def carregar_base_dados():
-    url = "http://www.ipeadata.gov.br/ExibeSerie.aspx?module=m&serid=1650971490&oper=view"
+SERID_BRENT = "1650971490"
 
+# Demais séries do IPEA (WTI, câmbio...) ficam uma por arquivo e alinhadas por data na tabela larga
+DIRETORIO_SERIES = os.path.join(DIRETORIO_DADOS, "series")
+CAMINHO_SERIES_ALINHADAS = os.path.join(DIRETORIO_DADOS, "series_ipea.parquet")
+MAXIMO_THREADS = 4
+
+# Guarda a última data ingerida de cada série (marca d'água da ingestão incremental)
+CAMINHO_MARCA_INGESTAO = os.path.join(DIRETORIO_DADOS, "marca_ingestao.json")
+_trava_marca = threading.Lock()
+
+DATA_INICIO = pd.Timestamp("2005-01-01")
+DATA_FIM = pd.Timestamp("2025-12-31")
+
+# Série do Brent usada pelo dashboard e pelo treino: período de 2005 a 2025 e coluna "Preço (US$)".
+# As demais séries, por padrão, ficam com o período completo do IPEA e uma coluna com o próprio serid.
+SERIE_BRENT = {"serid": SERID_BRENT, "coluna": COLUNA_PRECO, "inicio": DATA_INICIO, "fim": DATA_FIM}
+
+
+def ler_marca_ingestao(serid=SERID_BRENT):
+    """Retorna a última data ingerida para a série ou None se ainda não houve ingestão."""
     try:
-        # Tenta acessar a API e carregar os dados
-        response = requests.get(url, timeout=10)  # Timeout de 10 segundos para evitar travamento
+        with open(CAMINHO_MARCA_INGESTAO, encoding="utf-8") as arquivo:
+            marcas = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    marca = marcas.get(serid)
+    return pd.Timestamp(marca) if marca else None
+
+
+def salvar_marca_ingestao(data, serid=SERID_BRENT):
+    # As séries podem ser ingeridas em paralelo; a leitura e a escrita do arquivo não podem se misturar
+    with _trava_marca:
+        try:
+            with open(CAMINHO_MARCA_INGESTAO, encoding="utf-8") as arquivo:
+                marcas = json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            marcas = {}
+
+        marcas[serid] = pd.Timestamp(data).strftime("%Y-%m-%d")
+
+        with arquivo_atomico(CAMINHO_MARCA_INGESTAO, "w", encoding="utf-8") as arquivo:
+            json.dump(marcas, arquivo, indent=2)
+
+
+def caminho_serie(serid):
+    if serid == SERID_BRENT:
+        return CAMINHO_PARQUET
+    return os.path.join(DIRETORIO_SERIES, f"{serid}.parquet")
+
+
+def existe_base_local(serid):
+    if serid == SERID_BRENT:
+        return os.path.exists(CAMINHO_PARQUET) or os.path.exists(CAMINHO_CSV)
+    return os.path.exists(caminho_serie(serid))
 
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
 
-            # Procurar a tabela na página
-            table = soup.find("table", {"class": "dxgvTable"})
+def especificacao_serie(serie):
+    """
+    Série a ingerir no formato {"serid", "coluna", "inicio", "fim"}, com os padrões preenchidos.
+    :param serie: serid, dicionário com o serid e os campos desejados ou o texto
+        "serid[:coluna[:inicio[:fim]]]" da linha de comando (datas em AAAA-MM-DD; vazio = sem limite).
+    """
+    if isinstance(serie, str):
+        partes = serie.split(":")
+        if len(partes) > 4:
+            raise ValueError(f"Série inválida: {serie!r} (use serid[:coluna[:inicio[:fim]]])")
+        serie = dict(zip(["serid", "coluna", "inicio", "fim"], partes))
+        serie = {campo: valor for campo, valor in serie.items() if valor}
 
-            if table:
-                df = pd.read_html(str(table))[0]
-                df.columns = ["Data", "Preço (US$)"]
+    padrao = SERIE_BRENT if serie["serid"] == SERID_BRENT else {"coluna": serie["serid"], "inicio": None, "fim": None}
+    especificacao = {**padrao, **serie}
+    for campo in ("inicio", "fim"):
+        if especificacao[campo] is not None:
+            especificacao[campo] = pd.Timestamp(especificacao[campo])
+    return especificacao
 
-                # Processamento dos dados
-                df = df[df["Data"].str.match(r"\d{2}/\d{2}/\d{4}", na=False)]
-                df["Data"] = pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce")
-                df["Preço (US$)"] = df["Preço (US$)"].str.replace(",", ".").astype(float) / 100
 
-                # Filtrar período de 2005 a 2025
-                df = df[(df["Data"] >= "2005-01-01") & (df["Data"] <= "2025-12-31")]
-                df.reset_index(drop=True, inplace=True)
+def atualizar_serie(serid, incremental=True, coluna=COLUNA_PRECO, inicio=None, fim=None):
+    """
+    Baixa uma série do IPEA (página ExibeSerie) e mantém o seu armazenamento local em dados/.
+    Não mostra nada na tela e propaga os erros, podendo rodar fora de uma sessão do Streamlit.
+    :param incremental: Quando existe ingestão anterior, converte apenas as linhas mais novas que a
+        marca d'água salva e as acrescenta à base local em vez de reescrevê-la.
+    :param coluna: Nome da coluna de valores.
+    :param inicio: Primeira data mantida (None para não limitar).
+    :param fim: Última data mantida (None para não limitar).
+    :return: DataFrame com "Data" e a coluna de valores, com toda a série em ordem cronológica.
+    """
+    caminho = caminho_serie(serid)
 
-                # Criar diretório "dados/" se não existir
-                diretorio_dados = "dados"
-                if not os.path.exists(diretorio_dados):
-                    os.makedirs(diretorio_dados)
+    desde = None
+    if incremental and existe_base_local(serid):
+        desde = ler_marca_ingestao(serid)
 
-                # Salvar o arquivo CSV no diretório "dados/"
-                caminho_arquivo = os.path.join(diretorio_dados, "dados_petroleo_brent_2005_2025.csv")
-                df.to_csv(caminho_arquivo, index=False, encoding="utf-8")
-                # st.success(f"✅ Dados salvos em {caminho_arquivo}")
+    # Tenta acessar a API (sessão com pool, novas tentativas e requisição condicional)
+    cliente = obter_cliente()
+    conteudo = cliente.buscar_serie(serid, condicional=desde is not None)
 
-                return df
+    if conteudo is None:
+        # Página idêntica à da última ingestão: nada a processar
+        return ler_dados(caminho, coluna)
 
-            else:
-                raise ValueError("Tabela não encontrada na página.")
+    # Extrair a tabela dxgvTable em uma única passada (ValueError se não houver tabela)
+    datas, precos = extrair_serie(conteudo, desde=desde)
+    df = serie_para_dataframe(datas, precos).rename(columns={COLUNA_PRECO: coluna})
 
-        else:
-            raise ConnectionError(f"Erro ao acessar a página. Código: {response.status_code}")
+    # Filtrar o período da série
+    if inicio is not None:
+        df = df[df["Data"] >= inicio]
+    if fim is not None:
+        df = df[df["Data"] <= fim]
+    df.reset_index(drop=True, inplace=True)
+
+    if desde is None:
+        # Ingestão completa: reescreve a base local no diretório "dados/"
+        salvar_dados(df, caminho, coluna)
+        df_completo = df
+    elif not df.empty:
+        # Ingestão incremental: acrescenta somente as linhas novas
+        df_completo = acrescentar_dados(df, caminho, coluna)
+    else:
+        df_completo = ler_dados(caminho, coluna)
+
+    if not df.empty:
+        salvar_marca_ingestao(df["Data"].max(), serid)
+    cliente.confirmar_serie(serid)
+
+    return df_completo
+
+
+def atualizar_base_dados(incremental=True):
+    """Atualiza a série do petróleo Brent (ver atualizar_serie)."""
+    return atualizar_serie(
+        SERID_BRENT, incremental=incremental, coluna=COLUNA_PRECO, inicio=DATA_INICIO, fim=DATA_FIM
+    )
+
+
+def atualizar_series(series, incremental=True, max_threads=MAXIMO_THREADS):
+    """
+    Busca e processa várias séries do IPEA em paralelo (pool limitado de threads), de modo que o
+    tempo total fique próximo ao da série mais lenta, e grava as séries lado a lado.
+    :param series: Lista de séries no formato aceito por especificacao_serie (serids, dicionários
+        ou textos "serid[:coluna[:inicio[:fim]]]").
+    :return: DataFrame com a coluna "Data" e a coluna de cada série, alinhadas por data.
+    """
+    especificacoes = {}
+    for serie in series:
+        especificacao = especificacao_serie(serie)
+        especificacoes[especificacao["serid"]] = especificacao
+    colunas = [especificacao["coluna"] for especificacao in especificacoes.values()]
+    if len(set(colunas)) != len(colunas):
+        raise ValueError(f"Colunas repetidas entre as séries: {colunas}")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(especificacoes)))) as executor:
+        futuros = {
+            serid: executor.submit(
+                atualizar_serie, serid, incremental, especificacao["coluna"], especificacao["inicio"], especificacao["fim"]
+            )
+            for serid, especificacao in especificacoes.items()
+        }
+
+        dados = {}
+        for serid, futuro in futuros.items():
+            coluna = especificacoes[serid]["coluna"]
+            try:
+                dados[coluna] = futuro.result()
+            except Exception as e:
+                # Uma série com problema não derruba as demais: usa a cópia local se houver
+                if not existe_base_local(serid):
+                    raise
+                print(f"⚠️ Erro ao atualizar a série {serid} ({e}); usando a base local.")
+                dados[coluna] = ler_dados(caminho_serie(serid), coluna)
+
+    df = alinhar_series(dados)
+    with arquivo_atomico(CAMINHO_SERIES_ALINHADAS) as arquivo:
+        df.to_parquet(arquivo, index=False)
+    return df
+
+
+def alinhar_series(series):
+    """Junta as séries {coluna: DataFrame} em uma tabela larga indexada pela união das datas."""
+    colunas = [df.set_index("Data")[coluna] for coluna, df in series.items()]
+    df = pd.concat(colunas, axis=1, join="outer").sort_index()
+    df.index.name = "Data"
+    return df.reset_index()
+
+
+def carregar_base_dados(incremental=True):
+    try:
+        return atualizar_base_dados(incremental=incremental)
 
     except Exception as e:
         # Se ocorrer um erro, tenta carregar o arquivo local
         st.error(f"❌ Erro ao acessar a API: {e}")
         try:
-            caminho_arquivo_local = os.path.join("dados", "dados_petroleo_brent_2005_2025.csv")
-            df = pd.read_csv(caminho_arquivo_local)
+            df = ler_dados()
             st.warning("⚠️ Carregando dados do arquivo local.")
             return df
         except FileNotFoundError:
@@ -65,4 +226,4 @@ def carregar_base_dados():
 
 # # Exibir as primeiras linhas do DataFrame
 # if df is not None:
-#     print(df.head())  # ✅ Correto
\ No newline at end of file
+#     print(df.head())  # ✅ Correto
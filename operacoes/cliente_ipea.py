@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from operacoes.armazenamento import DIRETORIO_DADOS
+from operacoes.gravacao import arquivo_atomico
+
+URL_IPEA_OFICIAL = "http://www.ipeadata.gov.br"
+# Pode apontar para o servidor de replay local (operacoes.servidor_replay) em testes e benchmarks
+URL_BASE = os.environ.get("IPEA_URL_BASE", URL_IPEA_OFICIAL)
+CAMINHO_SERIE = "/ExibeSerie.aspx?module=m&serid={serid}&oper=view"
+
+# Validadores HTTP (ETag/Last-Modified) e hash do conteúdo da última resposta de cada URL
+CAMINHO_CACHE_HTTP = os.path.join(DIRETORIO_DADOS, "cache_http.json")
+
+STATUS_REPETIVEIS = {429, 500, 502, 503, 504}
+
+
+class ErroIpea(ConnectionError):
+    pass
+
+
+class ClienteIpea:
+    """
+    Cliente HTTP do IPEA com sessão persistente (pool de conexões), requisições condicionais e
+    novas tentativas limitadas com backoff exponencial e jitter.
+    """
+
+    def __init__(self, url_base=URL_BASE, tentativas=4, espera_base=0.5, espera_maxima=8.0, timeout=10):
+        self.url_base = url_base.rstrip("/")
+        self.tentativas = tentativas
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.timeout = timeout
+
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+
+        self._trava = threading.Lock()
+        self._pendentes = {}
+
+    def url_serie(self, serid):
+        return self.url_base + CAMINHO_SERIE.format(serid=serid)
+
+    def _ler_cache(self):
+        try:
+            with open(CAMINHO_CACHE_HTTP, encoding="utf-8") as arquivo:
+                return json.load(arquivo)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def confirmar(self, url):
+        """Grava os validadores da última resposta depois que o conteúdo foi processado com sucesso."""
+        with self._trava:
+            validadores = self._pendentes.pop(url, None)
+            if validadores is None:
+                return
+            cache = self._ler_cache()
+            cache[url] = validadores
+            with arquivo_atomico(CAMINHO_CACHE_HTTP, "w", encoding="utf-8") as arquivo:
+                json.dump(cache, arquivo, indent=2)
+
+    def _espera(self, tentativa, response=None):
+        # Respeita Retry-After quando o servidor informa; senão, "full jitter" sobre o backoff exponencial
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return min(float(response.headers["Retry-After"]), self.espera_maxima)
+        return random.uniform(0, min(self.espera_maxima, self.espera_base * 2**tentativa))
+
+    def _get(self, url, headers):
+        for tentativa in range(self.tentativas):
+            ultima = tentativa == self.tentativas - 1
+            try:
+                response = self.sessao.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if ultima:
+                    raise ErroIpea(f"Falha ao acessar o IPEA após {self.tentativas} tentativas: {e}") from e
+                time.sleep(self._espera(tentativa))
+                continue
+
+            if response.status_code in STATUS_REPETIVEIS and not ultima:
+                time.sleep(self._espera(tentativa, response))
+                continue
+            return response
+
+    def buscar(self, url, condicional=True):
+        """
+        Busca a página.
+        :param condicional: Envia os validadores da última resposta e compara o hash do conteúdo.
+        :return: Bytes da página ou None se ela não mudou desde a última busca.
+            Os validadores só são gravados quando o chamador chama confirmar(url).
+        """
+        anterior = self._ler_cache().get(url, {}) if condicional else {}
+
+        headers = {}
+        if anterior.get("etag"):
+            headers["If-None-Match"] = anterior["etag"]
+        if anterior.get("last_modified"):
+            headers["If-Modified-Since"] = anterior["last_modified"]
+
+        response = self._get(url, headers)
+
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise ErroIpea(f"Erro ao acessar a página. Código: {response.status_code}")
+
+        # O IPEA nem sempre envia validadores; o hash evita reprocessar uma página idêntica
+        hash_conteudo = hashlib.sha256(response.content).hexdigest()
+        if anterior.get("sha256") == hash_conteudo:
+            return None
+
+        with self._trava:
+            self._pendentes[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "sha256": hash_conteudo,
+            }
+        return response.content
+
+    def buscar_serie(self, serid, condicional=True):
+        return self.buscar(self.url_serie(serid), condicional=condicional)
+
+    def confirmar_serie(self, serid):
+        self.confirmar(self.url_serie(serid))
+
+
+_cliente = None
+_trava_cliente = threading.Lock()
+
+
+def obter_cliente():
+    """Cliente único do processo, para reaproveitar as conexões abertas entre as buscas."""
+    global _cliente
+    with _trava_cliente:
+        if _cliente is None:
+            _cliente = ClienteIpea()
+        return _cliente
@@ -0,0 +1,112 @@
+"""
+Features do modelo de resíduos (XGBoost), usadas igualmente no treino, no backtest e na previsão.
+
+Para prever o resíduo de uma data usam-se apenas os resíduos anteriores a ela:
+- lags: resíduo 1, 2, ..., `lags` dias antes;
+- janelas móveis: média, desvio, mínimo e máximo dos últimos `w` resíduos, para cada `w` em "janelas";
+- calendário: ano, mês, dia, dia da semana e dia do ano da data prevista.
+
+A matriz é montada de uma vez, em float32 e contígua, a partir de uma visão de janelas deslizantes
+(numpy sliding_window_view) sobre a série de resíduos, sem criar colunas intermediárias com shift.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+ESTATISTICAS = {
+    "media": lambda janelas: janelas.mean(axis=1),
+    "desvio": lambda janelas: janelas.std(axis=1),
+    "minimo": lambda janelas: janelas.min(axis=1),
+    "maximo": lambda janelas: janelas.max(axis=1),
+}
+
+CALENDARIO = {
+    "ano": lambda datas: datas.year,
+    "mes": lambda datas: datas.month,
+    "dia": lambda datas: datas.day,
+    "dia_semana": lambda datas: datas.dayofweek,
+    "dia_ano": lambda datas: datas.dayofyear,
+}
+
+
+def _features(config):
+    return config.get("features", {})
+
+
+def tamanho_historico(config):
+    """Quantos resíduos anteriores são necessários para montar as features de uma data."""
+    return max([config["lags"], *_features(config).get("janelas", [])])
+
+
+def nomes_features(config):
+    nomes = [f"Resíduo_Lag_{i}" for i in range(1, config["lags"] + 1)]
+    for janela in _features(config).get("janelas", []):
+        nomes += [f"Resíduo_{estatistica}_{janela}" for estatistica in _features(config).get("estatisticas", [])]
+    nomes += [f"Calendário_{campo}" for campo in _features(config).get("calendario", [])]
+    return nomes
+
+
+def features_calendario(datas, config):
+    """Campos de calendário das datas, (len(datas), n_campos) em float32."""
+    datas = pd.DatetimeIndex(datas)
+    campos = _features(config).get("calendario", [])
+    matriz = np.empty((len(datas), len(campos)), dtype=np.float32)
+    for coluna, campo in enumerate(campos):
+        matriz[:, coluna] = CALENDARIO[campo](datas)
+    return matriz
+
+
+def preencher_features(janelas, datas, config, calendario=None):
+    """
+    Uma linha por janela: janelas[j] são os resíduos imediatamente anteriores a datas[j].
+    :param calendario: Campos de calendário já calculados (features_calendario); evita recalculá-los
+        a cada passo de um rollout.
+    """
+    historico = janelas.shape[1]
+    matriz = np.empty((len(janelas), len(nomes_features(config))), dtype=np.float32)
+
+    # Lags: o lag 1 é o último valor da janela
+    lags = config["lags"]
+    matriz[:, :lags] = janelas[:, historico - lags :][:, ::-1]
+    coluna = lags
+
+    for janela in _features(config).get("janelas", []):
+        recorte = janelas[:, historico - janela :]
+        for estatistica in _features(config).get("estatisticas", []):
+            matriz[:, coluna] = ESTATISTICAS[estatistica](recorte)
+            coluna += 1
+
+    matriz[:, coluna:] = features_calendario(datas, config) if calendario is None else calendario
+    return matriz
+
+
+def montar_features(residuos, datas, config):
+    """
+    Features de treino: a linha j prevê residuos[h + j] (h = tamanho_historico) a partir de residuos[j:h + j].
+    :param residuos: Série de resíduos em ordem cronológica.
+    :param datas: Datas de cada resíduo (mesmo tamanho).
+    :return: (X, y, datas_alvo), com X float32 de len(residuos) - h linhas.
+    """
+    residuos = np.asarray(residuos, dtype=np.float32)
+    historico = tamanho_historico(config)
+    if len(residuos) <= historico:
+        raise ValueError("Não há dados históricos suficientes para montar as features do resíduo.")
+
+    janelas = sliding_window_view(residuos, historico)[:-1]
+    datas_alvo = pd.DatetimeIndex(datas)[historico:]
+    return preencher_features(janelas, datas_alvo, config), residuos[historico:], datas_alvo
+
+
+def features_previsao(residuos, datas, config):
+    """
+    Features para prever o resíduo das datas informadas a partir dos últimos resíduos conhecidos:
+    lags e janelas móveis vêm do fim da série e o calendário, de cada data.
+    """
+    historico = tamanho_historico(config)
+    ultimos = np.asarray(residuos, dtype=np.float32)[-historico:]
+    if len(ultimos) < historico:
+        raise ValueError("Não há dados históricos suficientes para prever o resíduo.")
+
+    # A mesma janela para todas as datas, sem copiar
+    janelas = np.broadcast_to(ultimos, (len(datas), historico))
+    return preencher_features(janelas, datas, config)
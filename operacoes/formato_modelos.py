@@ -0,0 +1,97 @@
+"""
+Formatos nativos dos modelos: Prophet em JSON (prophet.serialize) e XGBoost no formato UBJSON do booster.
+
+Diferente dos pickles do joblib, esses formatos não dependem da versão exata das classes Python, são
+menores e carregam mais rápido. O sha256 de cada arquivo é registrado no manifesto e conferido antes de
+construir o modelo.
+
+Exceção: o JSON do Prophet inclui o histórico de treino, lido com pd.read_json, e fica cerca de 2x maior
+e 2x mais lento para carregar que o pickle do joblib (python -m operacoes.benchmark_modelos). O pickle,
+também com checksum, continua disponível: python -m operacoes.treinar --formato-prophet pickle.
+"""
+import hashlib
+import io
+from operacoes.gravacao import gravar_atomico
+
+ARQUIVO_PROPHET_JSON = "modelo_prophet.json"
+ARQUIVO_PROPHET_PICKLE = "modelo_prophet.pkl"
+ARQUIVO_XGB_UBJ = "modelo_xgboost.ubj"
+
+
+class ErroIntegridade(ValueError):
+    """O conteúdo do artefato não confere com o checksum registrado."""
+
+
+def calcular_checksum(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def _gravar(conteudo, caminho):
+    gravar_atomico(caminho, conteudo)
+    return calcular_checksum(conteudo)
+
+
+def ler_verificado(caminho, checksum=None):
+    """Conteúdo do arquivo, conferido com o sha256 registrado (ErroIntegridade se não conferir)."""
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    if checksum is not None and calcular_checksum(conteudo) != checksum:
+        raise ErroIntegridade(f"Checksum inválido em {caminho}; treine o modelo novamente.")
+    return conteudo
+
+
+def salvar_prophet(prophet, caminho):
+    """Grava o Prophet em JSON e retorna o sha256 do arquivo."""
+    from prophet.serialize import model_to_json
+
+    return _gravar(model_to_json(prophet).encode("utf-8"), caminho)
+
+
+def ler_prophet(caminho, checksum=None):
+    from prophet.serialize import model_from_json
+
+    return model_from_json(ler_verificado(caminho, checksum).decode("utf-8"))
+
+
+def salvar_pickle(objeto, caminho):
+    """Grava o objeto com o joblib (formato das versões antigas) e retorna o sha256 do arquivo."""
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump(objeto, buffer)
+    return _gravar(buffer.getvalue(), caminho)
+
+
+def ler_pickle(caminho, checksum=None):
+    import joblib
+
+    return joblib.load(io.BytesIO(ler_verificado(caminho, checksum)))
+
+
+# Formatos do Prophet aceitos pelo treino: (arquivo, gravação)
+FORMATOS_PROPHET = {
+    "json": (ARQUIVO_PROPHET_JSON, salvar_prophet),
+    "pickle": (ARQUIVO_PROPHET_PICKLE, salvar_pickle),
+}
+
+
+def salvar_xgb(model_xgb, caminho):
+    """Grava o booster do XGBRegressor em UBJSON e retorna o sha256 do arquivo."""
+    return _gravar(bytes(model_xgb.get_booster().save_raw(raw_format="ubj")), caminho)
+
+
+def ler_xgb(caminho, checksum=None):
+    import xgboost as xgb
+
+    model_xgb = xgb.XGBRegressor()
+    model_xgb.load_model(bytearray(ler_verificado(caminho, checksum)))
+    return model_xgb
+
+
+def ler_booster(caminho, checksum=None):
+    """Só o booster do XGBoost (sem o XGBRegressor e, portanto, sem o scikit-learn), para inferência."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(bytearray(ler_verificado(caminho, checksum)))
+    return booster
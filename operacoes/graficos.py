@@ -0,0 +1,145 @@
+"""
+Redução de pontos das séries longas antes de enviá-las ao navegador.
+
+Os gráficos de linha diários têm milhares de pontos (mais de 5.000 na série do Brent) e o Plotly envia
+todos para o navegador. Aqui cada série é reduzida no servidor pelo algoritmo Largest-Triangle-Three-
+Buckets (LTTB): os pontos internos são divididos em baldes e, de cada balde, fica o ponto que forma o
+maior triângulo com o ponto escolhido no balde anterior e a média do próximo. Picos e vales, que são o
+que importa visualmente, são preservados.
+
+Cada gráfico tem o seu orçamento de pontos (PONTOS_POR_GRAFICO). Ao escolher um período menor no
+seletor do gráfico, a série é recortada antes da redução: o mesmo orçamento cobre um intervalo
+menor e o trecho ampliado aparece com mais resolução.
+
+Uso (tamanho do gráfico enviado ao navegador, com e sem a redução):
+    python -m operacoes.graficos
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+# Orçamento de pontos por série de cada gráfico
+PONTOS_POR_GRAFICO = {
+    "preco_historico": 1500,
+    "variacao_percentual": 1500,
+    "real_vs_previsto": 1500,
+}
+
+
+def lttb(x, y, limite):
+    """
+    Índices dos `limite` pontos escolhidos pelo LTTB (o primeiro e o último sempre ficam).
+    :param x: Valores do eixo x em ordem crescente (números ou datas).
+    :param y: Valores da série, sem NaN.
+    """
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = (x - x[0]) / np.timedelta64(1, "D")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # limite - 2 baldes com os pontos internos (o primeiro e o último ponto ficam fora dos baldes)
+    bordas = np.linspace(1, n - 1, limite - 1).astype(int)
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    anterior = 0
+    for balde in range(limite - 2):
+        inicio, fim = bordas[balde], bordas[balde + 1]
+        # Média do próximo balde; para o último balde, o último ponto
+        proximo_inicio, proximo_fim = (bordas[balde + 1], bordas[balde + 2]) if balde + 2 < len(bordas) else (n - 1, n)
+        media_x = x[proximo_inicio:proximo_fim].mean()
+        media_y = y[proximo_inicio:proximo_fim].mean()
+
+        # Área (x2) do triângulo entre o ponto anterior, cada candidato do balde e a média do próximo
+        areas = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[balde + 1] = anterior
+    return indices
+
+
+def reduzir_serie(df, x, y, limite, intervalo=None):
+    """
+    Linhas de `df` a desenhar para a série `y`: recortadas ao intervalo e reduzidas a `limite` pontos.
+    :param intervalo: (inicio, fim) do eixo x, inclusive; None para a série inteira.
+    """
+    df = df[df[y].notna()]
+    if intervalo is not None:
+        inicio, fim = pd.Timestamp(intervalo[0]), pd.Timestamp(intervalo[1])
+        df = df[(df[x] >= inicio) & (df[x] <= fim)]
+    return df.iloc[lttb(df[x].to_numpy(), df[y].to_numpy(), limite)]
+
+
+def reduzir_series(df, x, colunas, limite, intervalo=None):
+    """
+    Várias séries de `df` reduzidas cada uma a `limite` pontos, no formato longo do Plotly Express
+    (colunas x, "variable" e "value"), equivalente a px.line(df, x=x, y=colunas).
+    """
+    partes = [
+        reduzir_serie(df, x, coluna, limite, intervalo)[[x, coluna]]
+        .rename(columns={coluna: "value"})
+        .assign(variable=coluna)
+        for coluna in colunas
+    ]
+    return pd.concat(partes, ignore_index=True)[[x, "variable", "value"]]
+
+
+def selecionar_periodo(chave, datas, rotulo="🔍 Período do gráfico"):
+    """
+    Seletor do período exibido no gráfico (por padrão, a série inteira).
+    :return: (inicio, fim) escolhidos ou None se o período completo estiver selecionado.
+    """
+    import streamlit as st
+
+    minimo, maximo = pd.Timestamp(datas.min()).date(), pd.Timestamp(datas.max()).date()
+    if minimo == maximo:
+        return None
+    with st.expander(rotulo):
+        inicio, fim = st.slider(
+            "Ampliar um trecho mostra a série com mais detalhes.",
+            min_value=minimo,
+            max_value=maximo,
+            value=(minimo, maximo),
+            format="DD/MM/YYYY",
+            key=chave,
+        )
+    if (inicio, fim) == (minimo, maximo):
+        return None
+    return inicio, fim
+
+
+def medir_payload(df, x, y, limite):
+    """Tamanho (bytes) do JSON do gráfico de linha com todos os pontos e com a série reduzida."""
+    import plotly.express as px
+
+    completo = px.line(df, x=x, y=y).to_json()
+    reduzido = px.line(reduzir_serie(df, x, y, limite), x=x, y=y).to_json()
+    return len(df), len(completo), len(reduzido)
+
+
+def main():
+    from operacoes.armazenamento import ler_dados
+
+    parser = argparse.ArgumentParser(description="Tamanho dos gráficos com e sem a redução de pontos.")
+    parser.add_argument("--pontos", type=int, default=PONTOS_POR_GRAFICO["preco_historico"])
+    args = parser.parse_args()
+
+    df = ler_dados()
+    df["Variação (%)"] = df["Preço (US$)"].pct_change() * 100
+    for coluna in ("Preço (US$)", "Variação (%)"):
+        linhas, completo, reduzido = medir_payload(df, "Data", coluna, args.pontos)
+        print(
+            f"{coluna:<14} {linhas} pontos: {completo / 1024:7.1f} KiB -> {min(args.pontos, linhas)} pontos: "
+            f"{reduzido / 1024:7.1f} KiB ({completo / reduzido:.1f}x menor)"
+        )
+
+
+if __name__ == "__main__":
+    main()
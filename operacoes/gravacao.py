@@ -0,0 +1,96 @@
+"""
+Escrita segura de arquivos compartilhados entre processos (modelo/ e dados/ em um volume comum).
+
+- arquivo_atomico: grava em um arquivo temporário no mesmo diretório e só então o renomeia para o
+  destino (os.replace é atômico no mesmo sistema de arquivos). Quem lê vê o arquivo antigo ou o novo,
+  nunca um arquivo pela metade; se a gravação falhar, o destino fica intacto.
+- diretorio_temporario / publicar_diretorio: o mesmo para um conjunto de arquivos (uma versão dos
+  modelos), montado à parte e publicado com uma renomeação para um diretório novo.
+- trava_arquivo: trava exclusiva entre processos (fcntl.flock) para que só um processo execute um
+  trecho de cada vez, por exemplo o treino.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem flock, a trava não coordena processos
+    fcntl = None
+
+
+@contextmanager
+def arquivo_atomico(caminho, modo="wb", encoding=None):
+    """
+    Arquivo aberto para escrita que só substitui `caminho` ao sair do bloco sem erro.
+    :param modo: "wb" (bytes) ou "w" (texto).
+    """
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descritor, modo, encoding=encoding) as arquivo:
+            yield arquivo
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        # mkstemp cria o arquivo só para o dono; os artefatos são lidos por outros processos
+        os.chmod(temporario, 0o644)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def gravar_atomico(caminho, conteudo):
+    """Grava bytes em `caminho` de forma atômica."""
+    with arquivo_atomico(caminho) as arquivo:
+        arquivo.write(conteudo)
+
+
+@contextmanager
+def trava_arquivo(caminho, aviso=None):
+    """
+    Trava exclusiva entre processos, mantida enquanto o bloco executa.
+    :param aviso: Mensagem impressa quando outro processo já detém a trava e é preciso esperar.
+    :return: (no `as`) segundos esperados pela trava.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "a") as arquivo:
+        if fcntl is None:
+            yield 0.0
+            return
+
+        inicio = time.perf_counter()
+        try:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if aviso:
+                print(aviso)
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX)
+        try:
+            yield time.perf_counter() - inicio
+        finally:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+
+
+def diretorio_temporario(destino):
+    """Diretório temporário ao lado de `destino`, para montar um conjunto de arquivos antes de publicá-lo."""
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(diretorio, exist_ok=True)
+    temporario = tempfile.mkdtemp(dir=diretorio, prefix=f".{os.path.basename(destino)}.", suffix=".tmp")
+    os.chmod(temporario, 0o755)
+    return temporario
+
+
+def publicar_diretorio(temporario, destino):
+    """
+    Publica o diretório montado em `temporario` como `destino`, com uma renomeação (atômica no mesmo
+    sistema de arquivos): os arquivos aparecem todos juntos. `destino` precisa ser um caminho novo;
+    um diretório publicado nunca é substituído, pois pode estar sendo lido (FileExistsError).
+    """
+    if os.path.exists(destino):
+        raise FileExistsError(f"{destino} já existe; publique a versão em um diretório novo.")
+    os.rename(temporario, destino)
+    return destino
@@ -0,0 +1,216 @@
+"""
+Pacote de inferência autossuficiente de uma versão treinada (modelo/versoes/<versao>/inferencia.json).
+
+Prever a partir do fim do histórico exige, além dos dois modelos, o estado do resíduo: os últimos
+resíduos do Prophet que alimentam os lags e as janelas móveis do XGBoost. O pacote guarda esse estado
+junto com a configuração das features, a data de corte do treino e os parâmetros já extraídos do
+Prophet (ver operacoes.prophet_rapido), com as larguras dos intervalos do treino. Para prever basta o
+pacote e o booster do XGBoost (modelo_xgboost.ubj, conferido pelo checksum): nem o histórico, nem o
+Prophet, nem o código de treino (operacoes.carregar_modelo) são carregados.
+
+Uso:
+    python -m operacoes.inferencia --inicio 2026-11-01 --dias 30          # versão atual
+    python -m operacoes.inferencia --inicio 2026-11-01 --dias 30 --diretorio modelo/versoes/<versao>
+    python -m operacoes.inferencia --verificar                            # confere com o cubo de previsões
+"""
+import argparse
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from operacoes import cache_modelos, formato_modelos
+from operacoes.features import tamanho_historico
+from operacoes.gravacao import gravar_atomico
+from operacoes.previsao_residuos import prever_residuos_diarios
+from operacoes.prophet_rapido import ProphetRapido
+from operacoes.registro import diretorio_versao
+
+ARQUIVO_PACOTE = "inferencia.json"
+
+
+def criar_pacote(df, prophet, prophet_future, config, checksum_xgb):
+    """
+    Conteúdo do pacote (tipos JSON) a partir do resultado de treinar_modelos.
+    As larguras dos intervalos são as da previsão do treino (prophet_future), de modo que o pacote
+    reproduz os mesmos limites do cubo de previsões.
+    """
+    rapido = ProphetRapido(prophet)
+    futuro = pd.to_datetime(prophet_future["ds"]) > rapido.fim_historico
+    previsao = prophet_future[futuro.to_numpy()]
+    if len(previsao):
+        rapido.larguras = {
+            "horizontes": ((pd.to_datetime(previsao["ds"]) - rapido.fim_historico) / pd.Timedelta(days=1)).to_numpy(),
+            "inferior": (previsao["yhat"] - previsao["yhat_lower"]).to_numpy(),
+            "superior": (previsao["yhat_upper"] - previsao["yhat"]).to_numpy(),
+        }
+
+    residuos = df["Resíduo"].to_numpy(np.float32)[-tamanho_historico(config) :]
+    return {
+        "corte": df["Data"].max().strftime("%Y-%m-%d"),
+        "config": {"lags": config["lags"], "features": config.get("features", {}), "data_final": config["data_final"]},
+        "residuos": residuos.tolist(),
+        "prophet": rapido.para_dict(),
+        "xgboost": {"arquivo": formato_modelos.ARQUIVO_XGB_UBJ, "checksum": checksum_xgb},
+    }
+
+
+def salvar_pacote(diretorio, pacote):
+    """Grava o pacote e retorna o sha256 do arquivo."""
+    conteudo = json.dumps(pacote, ensure_ascii=False).encode("utf-8")
+    gravar_atomico(os.path.join(diretorio, ARQUIVO_PACOTE), conteudo)
+    return formato_modelos.calcular_checksum(conteudo)
+
+
+class PacoteInferencia:
+    """Pacote carregado: previsão ajustada (Prophet + resíduo) de qualquer intervalo após o corte."""
+
+    def __init__(self, diretorio, pacote):
+        self.diretorio = diretorio
+        self.corte = pd.Timestamp(pacote["corte"])
+        self.config = pacote["config"]
+        self.prophet = ProphetRapido.de_dict(pacote["prophet"])
+        self.booster = formato_modelos.ler_booster(
+            os.path.join(diretorio, pacote["xgboost"]["arquivo"]), pacote["xgboost"]["checksum"]
+        )
+        self.residuos_conhecidos = np.asarray(pacote["residuos"], dtype=np.float32)
+        if len(self.residuos_conhecidos) < tamanho_historico(self.config):
+            raise ValueError(f"Pacote de inferência incompleto em {diretorio}; treine o modelo novamente.")
+
+        # Resíduos já previstos a partir do dia seguinte ao corte, estendidos conforme a demanda: de
+        # todos os dias e só dos dias úteis (de onde o rollout continua)
+        self._residuos_previstos = np.empty(0, dtype=np.float32)
+        self._residuos_uteis = np.empty(0, dtype=np.float32)
+        self._trava = threading.Lock()
+
+    def residuos_previstos(self, dias):
+        """Resíduos previstos para os `dias` dias seguintes ao corte (o rollout é reaproveitado entre chamadas)."""
+        with self._trava:
+            feitos = len(self._residuos_previstos)
+            if dias > feitos:
+                serie = np.concatenate([self.residuos_conhecidos, self._residuos_uteis])
+                datas = self.corte + pd.to_timedelta(np.arange(feitos + 1, dias + 1), unit="D")
+                uteis = datas.dayofweek < 5
+                if uteis.any():
+                    novos = prever_residuos_diarios(self.booster, serie, datas, self.config)
+                else:
+                    # Só sábado e domingo: repetem o resíduo do último dia útil, sem passar pelo booster
+                    novos = np.full(len(datas), serie[-1], dtype=np.float32)
+                self._residuos_previstos = np.concatenate([self._residuos_previstos, novos])
+                self._residuos_uteis = np.concatenate([self._residuos_uteis, novos[uteis]])
+            return self._residuos_previstos[:dias]
+
+    def prever(self, data_inicio, dias_futuros):
+        """
+        Previsão ajustada a partir de uma data posterior ao corte do treino.
+        :return: DataFrame no formato de criar_tabela_previsoes ("Data", "US$ Preço Previsto",
+            "US$ Estimativa de Preço Mínima", "US$ Estimativa de Preço Máxima").
+        """
+        datas = pd.date_range(start=data_inicio, periods=int(dias_futuros), freq="D")
+        deslocamento = (datas[0] - self.corte).days
+        if deslocamento < 1:
+            primeiro_dia = (self.corte + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+            raise ValueError(f"O pacote de inferência prevê a partir de {primeiro_dia}.")
+
+        residuo = self.residuos_previstos(deslocamento + len(datas) - 1)[deslocamento - 1 :]
+        yhat = self.prophet.prever_yhat(datas)
+        inferior, superior = self.prophet.intervalos(datas, yhat)
+
+        return pd.DataFrame(
+            {
+                "Data": datas.strftime("%Y/%m/%d"),
+                "US$ Preço Previsto": np.round(yhat + residuo, 2),
+                "US$ Estimativa de Preço Mínima": np.round(inferior + residuo, 2),
+                "US$ Estimativa de Preço Máxima": np.round(superior + residuo, 2),
+            }
+        )
+
+
+def _ler(caminho, checksum=None):
+    conteudo = formato_modelos.ler_verificado(caminho, checksum)
+    return PacoteInferencia(os.path.dirname(caminho), json.loads(conteudo))
+
+
+def carregar_pacote(diretorio=None, checksum=None):
+    """
+    Pacote de inferência pelo cache do processo.
+    :param diretorio: Diretório da versão (padrão: a versão atual do manifesto).
+    :param checksum: sha256 esperado do inferencia.json (opcional).
+    """
+    caminho = os.path.join(diretorio or diretorio_versao(), ARQUIVO_PACOTE)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(
+            f"Pacote de inferência não encontrado em {caminho}. Execute: python -m operacoes.treinar --forcar"
+        )
+    return cache_modelos.carregar(caminho, lambda caminho: _ler(caminho, checksum))
+
+
+def prever(data_inicio, dias_futuros, diretorio=None):
+    """Ponto de entrada da previsão: só precisa do pacote da versão (ver PacoteInferencia.prever)."""
+    return carregar_pacote(diretorio).prever(data_inicio, dias_futuros)
+
+
+def verificar(diretorio=None):
+    """
+    Confere o pacote com o cubo de previsões da versão atual nos intervalos sem dia útil: o primeiro
+    fim de semana após o corte (1 e 2 dias) e uma extensão só por sábado e domingo do rollout
+    memorizado (previsão até a sexta-feira e, em seguida, do fim de semana).
+    Cada caso usa um pacote recém-lido, sem o cache do processo.
+    :return: Lista de problemas encontrados (vazia se tudo certo).
+    """
+    from operacoes.carregar_modelo import criar_tabela_previsoes
+
+    caminho = os.path.join(diretorio or diretorio_versao(), ARQUIVO_PACOTE)
+    corte = _ler(caminho).corte
+    sabado = corte + pd.offsets.Week(weekday=5)
+    sexta = sabado - pd.Timedelta(days=1)
+    casos = {
+        "fim de semana (1 dia)": [(sabado, 1)],
+        "fim de semana (2 dias)": [(sabado, 2)],
+        "extensão só pelo fim de semana": [(corte + pd.Timedelta(days=1), (sexta - corte).days), (sabado, 2)],
+    }
+
+    problemas = []
+    for nome, chamadas in casos.items():
+        pacote = _ler(caminho)
+        for inicio, dias in chamadas:
+            if dias < 1:
+                continue
+            inicio = inicio.strftime("%Y-%m-%d")
+            try:
+                obtido = pacote.prever(inicio, dias)
+            except ValueError as erro:
+                problemas.append(f"{nome}: prever({inicio}, {dias}) falhou ({erro})")
+                break
+            esperado = criar_tabela_previsoes(inicio, dias)
+            diferenca = (obtido["US$ Preço Previsto"] - esperado["US$ Preço Previsto"]).abs().max()
+            if diferenca > 0.01:
+                problemas.append(f"{nome}: prever({inicio}, {dias}) difere do cubo em {diferenca:.2f}")
+    return problemas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Previsão a partir do pacote de inferência de uma versão.")
+    parser.add_argument("--inicio", help="Data inicial (YYYY-MM-DD), após o corte do treino.")
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--diretorio", help="Diretório da versão (padrão: a versão atual).")
+    parser.add_argument(
+        "--verificar", action="store_true", help="Confere o pacote com o cubo nos intervalos sem dia útil."
+    )
+    args = parser.parse_args()
+
+    if args.verificar:
+        problemas = verificar(args.diretorio)
+        for problema in problemas:
+            print(f"❌ {problema}")
+        if not problemas:
+            print("✅ Pacote de inferência igual ao cubo nos intervalos sem dia útil")
+        return
+    if args.inicio is None:
+        parser.error("informe --inicio (ou use --verificar)")
+
+    print(prever(args.inicio, args.dias, args.diretorio).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
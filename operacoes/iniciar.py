@@ -0,0 +1,133 @@
+"""
+Início do dashboard com os caches do processo já aquecidos (use no lugar de `streamlit run app_main.py`).
+
+Uso:
+    python -m operacoes.iniciar                         # aquece e sobe o servidor
+    python -m operacoes.iniciar --server.port 8080      # as demais opções vão para o streamlit run
+    python -m operacoes.iniciar --apenas-aquecer        # só aquece e mostra o tempo de cada etapa
+
+Antes de o servidor abrir a porta, o processo carrega a base de dados (servico_dados), as tabelas da
+versão atual e o cubo de previsões (cache_modelos), monta a previsão padrão de 30 dias e renderiza as
+páginas com os parâmetros padrão, o que preenche os agregados da série (agregados) e as figuras
+(cache_figuras). Os modelos em si não são carregados: nenhuma página os usa.
+O Streamlit roda no mesmo processo, então a primeira sessão já encontra tudo em memória.
+
+Como a porta só abre depois do aquecimento, o endpoint /_stcore/health do Streamlit só responde
+quando a instância está pronta: o balanceador de carga pode usá-lo para segurar o tráfego. Se alguma
+etapa do aquecimento falhar, o processo termina com código 1 sem abrir a porta (com --apenas-aquecer,
+o código de saída também indica a falha).
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Previsão aberta por padrão na página de resultados (ver app_modelo_previsao)
+DIAS_PREVISAO_PADRAO = 30
+
+
+@contextmanager
+def _sem_sessao():
+    """Silencia os avisos do Streamlit ao rodar as páginas fora de uma sessão (bare mode)."""
+    from streamlit import config, logger
+
+    nivel = config.get_option("logger.level")  # lido antes: a leitura da configuração redefine o nível
+    logger.set_log_level("error")
+    try:
+        yield
+    finally:
+        logger.set_log_level(nivel)
+
+
+def _carregar_dados():
+    from operacoes.servico_dados import obter_servico_dados
+
+    df = obter_servico_dados().obter()
+    if df is None:
+        raise RuntimeError("não foi possível carregar os dados do IPEA nem encontrar a base local")
+    return df
+
+
+def _carregar_previsoes():
+    from operacoes.carregar_modelo import carregar_previsoes, criar_tabela_previsoes
+
+    # As páginas só leem as tabelas da versão e o cubo (os modelos em si não são carregados)
+    carregar_previsoes()
+    # Lê o cubo de previsões (o mesmo recorte que a página abre por padrão)
+    criar_tabela_previsoes(date.today().strftime("%Y-%m-%d"), DIAS_PREVISAO_PADRAO)
+
+
+def _renderizar_paginas(df):
+    from operacoes.app_analise_historica import analises_historicas
+    from operacoes.app_detalhe_previsao import detalhe_previsao
+    from operacoes.app_modelo_previsao import modelo_de_previsao
+
+    # Com os widgets nos valores padrão, as figuras ficam com as mesmas chaves das sessões
+    with _sem_sessao():
+        analises_historicas(df)
+        modelo_de_previsao()
+        detalhe_previsao()
+
+
+def _etapa(nome, funcao, *args):
+    """Executa uma etapa do aquecimento e informa a duração. :return: (concluída, resultado)."""
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao(*args)
+    except Exception as e:
+        print(f"⚠️ {nome}: {e}")
+        return False, None
+    print(f"🔥 {nome} em {time.perf_counter() - inicio:.2f} s")
+    return True, resultado
+
+
+def aquecer():
+    """
+    Preenche os caches do processo (dados, tabelas da versão, cubo de previsões, agregados e figuras padrão).
+    Uma etapa que falha é informada e não impede as seguintes: a página correspondente mostra o erro.
+    :return: True se todas as etapas foram concluídas.
+    """
+    inicio = time.perf_counter()
+    dados_ok, df = _etapa("Base de dados", _carregar_dados)
+    modelos_ok, _ = _etapa("Previsões da versão atual", _carregar_previsoes)
+    paginas_ok = dados_ok and _etapa("Agregados e figuras das páginas", _renderizar_paginas, df)[0]
+
+    completo = dados_ok and modelos_ok and paginas_ok
+    print(f"{'✅' if completo else '⚠️'} Aquecimento concluído em {time.perf_counter() - inicio:.1f} s")
+    return completo
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Aquece os caches e inicia o dashboard no mesmo processo.",
+        epilog="As demais opções (por exemplo --server.port 8080) são repassadas ao streamlit run.",
+    )
+    parser.add_argument("--apenas-aquecer", action="store_true", help="Só aquece os caches, sem subir o servidor.")
+    args, opcoes_streamlit = parser.parse_known_args()
+
+    if args.apenas_aquecer:
+        sys.exit(0 if aquecer() else 1)
+
+    from streamlit import config
+    from streamlit.web import cli
+
+    # Aquece depois de o streamlit run ler a configuração (arquivos e opções) e antes de abrir a
+    # porta, no mesmo processo: as sessões usam os caches aquecidos. Só na primeira leitura.
+    def aquecer_uma_vez():
+        desconectar()
+        if not aquecer():
+            # Sem abrir a porta: a instância nunca fica pronta no /_stcore/health e o orquestrador a reinicia
+            print("❌ Aquecimento incompleto; o servidor não será iniciado.")
+            sys.exit(1)
+
+    desconectar = config.on_config_parsed(aquecer_uma_vez, force_connect=True)
+    sys.argv = ["streamlit", "run", os.path.join(RAIZ, "app_main.py"), *opcoes_streamlit]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Páginas do dashboard: item do menu -> (módulo, função).
+
+Os módulos só são importados quando a página é aberta: a "Visão Geral" e o "Deploy" não pagam a
+importação do plotly e das tabelas do modelo. Nenhuma página importa o Prophet, o XGBoost ou o
+scikit-learn (só o treino). O custo da primeira abertura de cada página é medido por
+python -m operacoes.tempo_importacao.
+"""
+import importlib
+
+PAGINAS = {
+    "🏠 Visão Geral": ("operacoes.app_visao_geral", "visao_geral"),
+    "📊 Análises Históricas": ("operacoes.app_analise_historica", "analises_historicas"),
+    "🤖 Informações do Modelo": ("operacoes.app_detalhe_previsao", "detalhe_previsao"),
+    "📈 Resultados e Predições": ("operacoes.app_modelo_previsao", "modelo_de_previsao"),
+    "🚀 Estratégia de Deploy": ("operacoes.app_estrategia_deploy", "detalhe_deploy"),
+}
+
+
+def carregar_pagina(nome):
+    """Função da página, importando o módulo dela na primeira vez (depois vem de sys.modules)."""
+    modulo, funcao = PAGINAS[nome]
+    return getattr(importlib.import_module(modulo), funcao)
@@ -0,0 +1,111 @@
+import io
+from array import array
+from datetime import date
+import numpy as np
+import pandas as pd
+from lxml import etree
+
+ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def _dias_desde_epoca(texto):
+    """Converte 'dd/mm/aaaa' em dias desde 1970-01-01 ou retorna None se o texto não for uma data."""
+    if len(texto) != 10 or texto[2] != "/" or texto[5] != "/":
+        return None
+    try:
+        return date(int(texto[6:]), int(texto[3:5]), int(texto[:2])).toordinal() - ORDINAL_EPOCA
+    except ValueError:
+        return None
+
+
+def extrair_serie(conteudo, desde=None):
+    """
+    Lê a tabela dxgvTable da página ExibeSerie do IPEA em uma única passada.
+    As linhas são consumidas à medida que o HTML é lido (sem montar a árvore da página,
+    sem voltar o HTML para texto e sem pd.read_html) e vão direto para arrays tipados.
+    :param conteudo: Bytes da página.
+    :param desde: Se informado, apenas datas posteriores a ela são retornadas.
+    :return: Tupla (datas datetime64[D], preços float64) em ordem cronológica.
+    """
+    limite = None
+    if desde is not None:
+        limite = pd.Timestamp(desde).date().toordinal() - ORDINAL_EPOCA
+
+    dias = array("q")
+    precos = array("d")
+    celulas = []
+    profundidade = 0  # tabelas abertas a partir da dxgvTable
+    encontrou = False
+    anterior = None
+    decrescente = None
+
+    for evento, elem in etree.iterparse(io.BytesIO(conteudo), events=("start", "end"), html=True):
+        tag = elem.tag
+
+        if tag == "table":
+            if evento == "start":
+                if profundidade:
+                    profundidade += 1
+                elif "dxgvTable" in (elem.get("class") or "").split():
+                    profundidade = 1
+                    encontrou = True
+            elif profundidade:
+                profundidade -= 1
+                if not profundidade:
+                    # Fim da tabela: o restante da página não interessa
+                    break
+            continue
+
+        if profundidade != 1 or evento == "start":
+            continue
+
+        if tag == "td":
+            celulas.append("".join(elem.itertext()).strip())
+            continue
+
+        if tag != "tr":
+            continue
+
+        linha, celulas = celulas, []
+        # Libera as linhas já processadas para manter a memória constante
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+
+        if len(linha) < 2:
+            continue
+        dia = _dias_desde_epoca(linha[0])
+        if dia is None:
+            continue
+
+        # O IPEA publica a série da data mais recente para a mais antiga; detectada a ordem,
+        # a leitura pode parar na primeira linha já ingerida
+        if anterior is not None and decrescente is None:
+            decrescente = dia < anterior
+        anterior = dia
+
+        if limite is not None and dia <= limite:
+            if decrescente:
+                break
+            continue
+
+        try:
+            preco = float(linha[1].replace(".", "").replace(",", "."))
+        except ValueError:
+            continue
+
+        dias.append(dia)
+        precos.append(preco)
+
+    if not encontrou:
+        raise ValueError("Tabela não encontrada na página.")
+
+    datas = np.frombuffer(dias, dtype=np.int64).view("datetime64[D]")
+    valores = np.frombuffer(precos, dtype=np.float64)
+
+    ordem = np.argsort(datas, kind="stable")
+    return datas[ordem], valores[ordem]
+
+
+def serie_para_dataframe(datas, precos):
+    return pd.DataFrame({"Data": datas.astype("datetime64[ns]"), "Preço (US$)": precos})
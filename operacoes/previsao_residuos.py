@@ -0,0 +1,179 @@
+"""
+Previsão recursiva do resíduo em vários horizontes.
+
+O resíduo do dia d+1 depende dos resíduos até d, inclusive os que acabaram de ser previstos. Em vez de
+um `predict` do XGBRegressor por dia e por ponto de partida, cada passo do horizonte é uma única chamada
+a `Booster.inplace_predict` sobre uma matriz NumPy com uma linha por ponto de partida: H dias para B
+pontos de partida custam H chamadas em lote, sem DataFrames nem DMatrix.
+
+Uso (latência para 1, 30 e 365 dias):
+    python -m operacoes.previsao_residuos                  # versão atual dos modelos
+    python -m operacoes.previsao_residuos --partidas 200
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from operacoes.features import features_calendario, features_previsao, preencher_features, tamanho_historico
+
+HORIZONTES_BENCHMARK = (1, 30, 365)
+
+
+def obter_booster(model_xgb):
+    return model_xgb.get_booster() if hasattr(model_xgb, "get_booster") else model_xgb
+
+
+def prever_residuos(model_xgb, residuos, datas, config):
+    """
+    Rollout recursivo do resíduo.
+    :param model_xgb: XGBRegressor (ou Booster) treinado com as features de operacoes.features.
+    :param residuos: Resíduos conhecidos até o ponto de partida, (n,) ou (B, n) para B pontos de partida.
+    :param datas: Datas a prever em ordem, (H,) comuns a todos os pontos de partida ou (B, H).
+    :return: Resíduos previstos, (H,) ou (B, H) conforme `residuos`.
+    """
+    booster = obter_booster(model_xgb)
+    historico = tamanho_historico(config)
+
+    um_ponto = np.ndim(residuos) == 1
+    residuos = np.atleast_2d(np.asarray(residuos, dtype=np.float32))
+    if residuos.shape[1] < historico:
+        raise ValueError("Não há dados históricos suficientes para prever o resíduo.")
+    partidas = residuos.shape[0]
+
+    datas = np.asarray(datas, dtype="datetime64[D]")
+    if datas.ndim == 1:
+        datas = np.broadcast_to(datas, (partidas, len(datas)))
+    horizonte = datas.shape[1]
+    if horizonte == 0:
+        previstos = np.empty((partidas, 0), dtype=np.float32)
+        return previstos[0] if um_ponto else previstos
+
+    # O calendário não depende das previsões: calculado uma vez para todas as datas
+    calendario = features_calendario(datas.ravel(), config)
+    calendario = calendario.reshape(partidas, horizonte, calendario.shape[1])
+
+    # Janela deslizante de cada ponto de partida: histórico conhecido seguido dos resíduos já previstos
+    serie = np.empty((partidas, historico + horizonte), dtype=np.float32)
+    serie[:, :historico] = residuos[:, -historico:]
+    for passo in range(horizonte):
+        X = preencher_features(serie[:, passo : passo + historico], None, config, calendario[:, passo])
+        serie[:, historico + passo] = booster.inplace_predict(X)
+
+    previstos = serie[:, historico:]
+    return previstos[0] if um_ponto else previstos
+
+
+def prever_residuos_diarios(model_xgb, residuos, datas, config):
+    """
+    Rollout do resíduo em dias corridos: `datas` são todos os dias, em ordem e sem lacunas, logo
+    após o último resíduo conhecido (como no cubo de previsões).
+    Os lags e as janelas foram treinados em pregões (dias úteis): o rollout avança só nos dias
+    úteis, e sábados e domingos repetem o resíduo do último dia útil.
+    :param residuos: Resíduos conhecidos, (n,), só de dias úteis.
+    :return: Resíduos previstos, (len(datas),).
+    """
+    datas = pd.DatetimeIndex(datas)
+    uteis = datas.dayofweek < 5
+    previstos = np.full(len(datas), np.nan, dtype=np.float32)
+    if uteis.any():
+        previstos[uteis] = prever_residuos(model_xgb, residuos, datas[uteis], config)
+    # Fim de semana logo no início: repete o último resíduo conhecido
+    inicial = float(np.asarray(residuos, dtype=np.float32)[-1])
+    return pd.Series(previstos).ffill().fillna(inicial).to_numpy(np.float32)
+
+
+def verificar_fins_de_semana(model_xgb, residuos, config):
+    """
+    Confere os intervalos sem dia útil: um horizonte vazio e um sábado e domingo logo após o último
+    resíduo repetem o resíduo conhecido, sem erro.
+    :return: Lista de problemas encontrados (vazia se tudo certo).
+    """
+    residuos = np.asarray(residuos, dtype=np.float32)
+    problemas = []
+    if prever_residuos(model_xgb, residuos, [], config).shape != (0,):
+        problemas.append("horizonte vazio não retorna um array vazio")
+
+    sabado = pd.Timestamp.today().normalize() + pd.offsets.Week(weekday=5)
+    fim_de_semana = prever_residuos_diarios(model_xgb, residuos, pd.date_range(sabado, periods=2, freq="D"), config)
+    if not np.array_equal(fim_de_semana, np.full(2, residuos[-1], dtype=np.float32)):
+        problemas.append(f"sábado e domingo não repetem o último resíduo: {fim_de_semana}")
+    return problemas
+
+
+def _um_predict_por_dia(model_xgb, residuos, datas, config):
+    # Referência: o rollout ingênuo, com um XGBRegressor.predict (DataFrame) por dia
+    from operacoes.features import nomes_features
+
+    serie = list(np.asarray(residuos, dtype=np.float32))
+    for data in datas:
+        X = pd.DataFrame(features_previsao(serie, [data], config), columns=nomes_features(config))
+        serie.append(float(model_xgb.predict(X)[0]))
+    return np.asarray(serie[len(residuos) :], dtype=np.float32)
+
+
+def medir(model_xgb, residuos, config, partidas=100, horizontes=HORIZONTES_BENCHMARK, repeticoes=3):
+    """
+    Latência (s) do rollout para cada horizonte: ingênuo (um predict por dia), em lote com um ponto de
+    partida e em lote com `partidas` pontos de partida.
+    """
+    residuos = np.asarray(residuos, dtype=np.float32)
+    historico = tamanho_historico(config)
+    # Pontos de partida: os últimos `partidas` dias do histórico
+    inicios = np.stack([residuos[len(residuos) - historico - i : len(residuos) - i] for i in range(partidas)])
+
+    resultados = {}
+    for horizonte in horizontes:
+        datas = pd.date_range(pd.Timestamp.today().normalize(), periods=horizonte, freq="D")
+
+        def melhor(funcao):
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                saida = funcao()
+                tempos.append(time.perf_counter() - inicio)
+            return min(tempos), saida
+
+        ingenuo, esperado = melhor(lambda: _um_predict_por_dia(model_xgb, residuos, datas, config))
+        lote, obtido = melhor(lambda: prever_residuos(model_xgb, residuos, datas, config))
+        varios, _ = melhor(lambda: prever_residuos(model_xgb, inicios, datas, config))
+        resultados[horizonte] = {
+            "ingenuo": ingenuo,
+            "lote": lote,
+            "varias_partidas": varios,
+            "diferenca_max": float(np.max(np.abs(esperado - obtido))),
+        }
+    return resultados
+
+
+def main():
+    from operacoes.carregar_modelo import CONFIG_PADRAO, carregar_modelos, ler_manifesto
+
+    parser = argparse.ArgumentParser(description="Latência do rollout recursivo do resíduo.")
+    parser.add_argument("--partidas", type=int, default=100, help="Pontos de partida no lote.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    manifesto = ler_manifesto()
+    df, prophet, model_xgb, test, prophet_future = carregar_modelos()
+    config = manifesto["versoes"][manifesto["atual"]].get("config", CONFIG_PADRAO)
+
+    resultados = medir(model_xgb, df["Resíduo"].to_numpy(), config, args.partidas, repeticoes=args.repeticoes)
+    print(f"Melhor de {args.repeticoes} execuções")
+    for horizonte, r in resultados.items():
+        print(
+            f"{horizonte:>4} dias: um predict por dia {r['ingenuo'] * 1000:8.1f} ms | "
+            f"em lote {r['lote'] * 1000:7.1f} ms ({r['ingenuo'] / r['lote']:4.1f}x) | "
+            f"{args.partidas} partidas em lote {r['varias_partidas'] * 1000:7.1f} ms "
+            f"({r['varias_partidas'] / args.partidas * 1000:.2f} ms por partida) | "
+            f"diferença máx. {r['diferenca_max']:.1e}"
+        )
+
+    problemas = verificar_fins_de_semana(model_xgb, df["Resíduo"].to_numpy(), config)
+    for problema in problemas:
+        print(f"❌ {problema}")
+    if not problemas:
+        print("✅ Intervalos sem dia útil (horizonte vazio, sábado e domingo) conferidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Inferência rápida e determinística de um Prophet já treinado.
+
+O `predict` do Prophet simula 1000 trajetórias de tendência (uncertainty_samples) a cada chamada e monta
+os componentes com pandas. Aqui os parâmetros ajustados (tendência por trechos e coeficientes de Fourier
+de cada sazonalidade) são extraídos uma vez e o yhat de qualquer intervalo de datas é calculado com
+numpy. Os intervalos vêm de larguras por horizonte, calibradas uma única vez com o predict completo em
+poucos horizontes e interpoladas; no histórico a largura é a do ruído de observação (sigma_obs).
+
+Uso (comparação de precisão e latência com o predict completo):
+    python -m operacoes.prophet_rapido                  # versão atual dos modelos
+"""
+import argparse
+import time
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+# Horizontes (dias após o fim do histórico) em que o predict completo é rodado para calibrar os intervalos
+PONTOS_CALIBRACAO = 60
+
+
+class ProphetRapido:
+    """Componentes pré-calculados de um Prophet treinado (crescimento linear ou constante)."""
+
+    def __init__(self, prophet, larguras=None):
+        """
+        :param prophet: Prophet já ajustado, sem feriados, regressores extras ou sazonalidades condicionais.
+        :param larguras: Dicionário com "horizontes", "inferior" e "superior" (ver calibrar); sem ele,
+            os intervalos usam apenas o ruído de observação.
+        """
+        if prophet.growth not in ("linear", "flat"):
+            raise ValueError(f"Crescimento '{prophet.growth}' não suportado pela inferência rápida.")
+        if prophet.extra_regressors or prophet.train_holiday_names is not None:
+            raise ValueError("Feriados e regressores extras não são suportados pela inferência rápida.")
+        if any(props["condition_name"] is not None for props in prophet.seasonalities.values()):
+            raise ValueError("Sazonalidades condicionais não são suportadas pela inferência rápida.")
+
+        # Parâmetros MAP (ou média das amostras, se o modelo foi ajustado com MCMC), como no predict
+        self.k = float(np.nanmean(prophet.params["k"]))
+        self.m = float(np.nanmean(prophet.params["m"]))
+        deltas = np.nanmean(prophet.params["delta"], axis=0)
+        beta = np.nanmean(prophet.params["beta"], axis=0)
+        self.sigma_obs = float(np.nanmean(prophet.params["sigma_obs"]))
+
+        self.crescimento = prophet.growth
+        self.inicio = prophet.start
+        self.escala_t = prophet.t_scale
+        self.escala_y = prophet.y_scale
+        self.piso = prophet.y_min if prophet.scaling == "minmax" else 0.0
+        self.fim_historico = prophet.history["ds"].max()
+        self.largura_intervalo = prophet.interval_width
+
+        # Tendência por trechos: inclinação e intercepto acumulados a partir de cada changepoint
+        self.changepoints = np.asarray(prophet.changepoints_t, dtype=float)
+        self.inclinacoes = self.k + np.concatenate(([0.0], np.cumsum(deltas)))
+        self.interceptos = self.m + np.concatenate(([0.0], np.cumsum(-self.changepoints * deltas)))
+
+        # Coeficientes de Fourier de cada sazonalidade (ordem das colunas: sin 1, cos 1, sin 2, cos 2, ...)
+        self.sazonalidades = {}
+        for nome, props in prophet.seasonalities.items():
+            coeficientes = beta[prophet.train_component_cols[nome].to_numpy().astype(bool)]
+            if props["mode"] == "additive":
+                coeficientes = coeficientes * self.escala_y
+            self.sazonalidades[nome] = (props["period"], props["fourier_order"], props["mode"], coeficientes)
+
+        self.larguras = larguras
+
+    @classmethod
+    def calibrar(cls, prophet, data_final, pontos=PONTOS_CALIBRACAO):
+        """
+        Cria o modelo rápido com as larguras dos intervalos do predict completo em `pontos` horizontes
+        entre o fim do histórico e a data final (uma única chamada ao predict, com poucas linhas).
+        """
+        rapido = cls(prophet)
+        dias = max((pd.Timestamp(data_final) - rapido.fim_historico).days, 1)
+        horizontes = np.unique(np.linspace(1, dias, min(pontos, dias)).round().astype(int))
+        datas = rapido.fim_historico + pd.to_timedelta(horizontes, unit="D")
+
+        previsao = prophet.predict(pd.DataFrame({"ds": datas}))
+        # Larguras não decrescentes com o horizonte, para suavizar o ruído da amostragem
+        rapido.larguras = {
+            "horizontes": horizontes,
+            "inferior": np.maximum.accumulate((previsao["yhat"] - previsao["yhat_lower"]).to_numpy()),
+            "superior": np.maximum.accumulate((previsao["yhat_upper"] - previsao["yhat"]).to_numpy()),
+        }
+        return rapido
+
+    def para_dict(self):
+        """Parâmetros extraídos em tipos JSON, para reconstruir o modelo sem o Prophet (ver de_dict)."""
+        dados = {
+            "k": self.k,
+            "m": self.m,
+            "sigma_obs": self.sigma_obs,
+            "crescimento": self.crescimento,
+            "inicio": self.inicio.isoformat(),
+            "escala_t_ns": int(pd.Timedelta(self.escala_t).value),
+            "escala_y": float(self.escala_y),
+            "piso": float(self.piso),
+            "fim_historico": self.fim_historico.isoformat(),
+            "largura_intervalo": float(self.largura_intervalo),
+            "changepoints": self.changepoints.tolist(),
+            "inclinacoes": self.inclinacoes.tolist(),
+            "interceptos": self.interceptos.tolist(),
+            "sazonalidades": {
+                nome: {"periodo": periodo, "ordem": ordem, "modo": modo, "coeficientes": coeficientes.tolist()}
+                for nome, (periodo, ordem, modo, coeficientes) in self.sazonalidades.items()
+            },
+            "larguras": None,
+        }
+        if self.larguras is not None:
+            dados["larguras"] = {nome: np.asarray(valores).tolist() for nome, valores in self.larguras.items()}
+        return dados
+
+    @classmethod
+    def de_dict(cls, dados):
+        """Modelo rápido a partir de para_dict, sem importar nem desserializar o Prophet."""
+        rapido = cls.__new__(cls)
+        rapido.k = dados["k"]
+        rapido.m = dados["m"]
+        rapido.sigma_obs = dados["sigma_obs"]
+        rapido.crescimento = dados["crescimento"]
+        rapido.inicio = pd.Timestamp(dados["inicio"])
+        rapido.escala_t = pd.Timedelta(dados["escala_t_ns"], unit="ns")
+        rapido.escala_y = dados["escala_y"]
+        rapido.piso = dados["piso"]
+        rapido.fim_historico = pd.Timestamp(dados["fim_historico"])
+        rapido.largura_intervalo = dados["largura_intervalo"]
+        rapido.changepoints = np.asarray(dados["changepoints"], dtype=float)
+        rapido.inclinacoes = np.asarray(dados["inclinacoes"], dtype=float)
+        rapido.interceptos = np.asarray(dados["interceptos"], dtype=float)
+        rapido.sazonalidades = {
+            nome: (s["periodo"], s["ordem"], s["modo"], np.asarray(s["coeficientes"], dtype=float))
+            for nome, s in dados["sazonalidades"].items()
+        }
+        rapido.larguras = None
+        if dados.get("larguras") is not None:
+            rapido.larguras = {nome: np.asarray(valores, dtype=float) for nome, valores in dados["larguras"].items()}
+        return rapido
+
+    def _tempos(self, datas):
+        datas = pd.DatetimeIndex(pd.to_datetime(datas))
+        t = ((datas - self.inicio) / self.escala_t).to_numpy(dtype=float)
+        dias_epoca = ((datas - pd.Timestamp("1970-01-01")) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        return datas, t, dias_epoca
+
+    def tendencia(self, t):
+        if self.crescimento == "flat":
+            return np.full_like(t, self.m) * self.escala_y + self.piso
+        trecho = np.searchsorted(self.changepoints, t, side="right")
+        return (self.inclinacoes[trecho] * t + self.interceptos[trecho]) * self.escala_y + self.piso
+
+    def componentes(self, datas):
+        """
+        Tendência e sazonalidades nas datas, como as colunas do predict do Prophet.
+        :return: DataFrame com "ds", "trend", uma coluna por sazonalidade, "additive_terms",
+            "multiplicative_terms" e "yhat".
+        """
+        datas, t, dias_epoca = self._tempos(datas)
+        colunas = {"ds": datas, "trend": self.tendencia(t)}
+        aditivos = np.zeros_like(t)
+        multiplicativos = np.zeros_like(t)
+
+        for nome, (periodo, ordem, modo, coeficientes) in self.sazonalidades.items():
+            angulos = 2 * np.pi * np.outer(dias_epoca, np.arange(1, ordem + 1)) / periodo
+            valor = np.sin(angulos) @ coeficientes[0::2] + np.cos(angulos) @ coeficientes[1::2]
+            colunas[nome] = valor
+            if modo == "additive":
+                aditivos += valor
+            else:
+                multiplicativos += valor
+
+        colunas["additive_terms"] = aditivos
+        colunas["multiplicative_terms"] = multiplicativos
+        colunas["yhat"] = colunas["trend"] * (1 + multiplicativos) + aditivos
+        return pd.DataFrame(colunas)
+
+    def prever_yhat(self, datas):
+        return self.componentes(datas)["yhat"].to_numpy()
+
+    def intervalos(self, datas, yhat):
+        """Limites inferior e superior: ruído de observação no histórico e larguras calibradas no futuro."""
+        datas = pd.DatetimeIndex(pd.to_datetime(datas))
+        z = NormalDist().inv_cdf(0.5 + self.largura_intervalo / 2)
+        ruido = z * self.sigma_obs * self.escala_y
+        inferior = np.full(len(datas), ruido)
+        superior = np.full(len(datas), ruido)
+
+        horizonte = ((datas - self.fim_historico) / pd.Timedelta(days=1)).to_numpy(dtype=float)
+        futuro = horizonte > 0
+        if self.larguras is not None and futuro.any():
+            pontos = np.concatenate(([0.0], self.larguras["horizontes"]))
+            for limite, larguras in ((inferior, self.larguras["inferior"]), (superior, self.larguras["superior"])):
+                valores = np.concatenate(([ruido], larguras))
+                limite[futuro] = np.interp(horizonte[futuro], pontos, valores)
+                # Além do último horizonte calibrado, a largura cresce proporcionalmente ao horizonte
+                alem = horizonte > pontos[-1]
+                limite[alem] = valores[-1] * horizonte[alem] / pontos[-1]
+
+        return yhat - inferior, yhat + superior
+
+    def prever(self, datas):
+        """Equivalente rápido de prophet.predict: componentes, yhat, yhat_lower e yhat_upper."""
+        previsao = self.componentes(datas)
+        previsao["yhat_lower"], previsao["yhat_upper"] = self.intervalos(previsao["ds"], previsao["yhat"].to_numpy())
+        return previsao
+
+
+def _diferenca_limites(a, b):
+    """Diferenças absolutas dos limites inferior e superior entre duas previsões, em um só array."""
+    return np.concatenate(
+        [
+            np.abs(a["yhat_lower"].to_numpy() - b["yhat_lower"].to_numpy()),
+            np.abs(a["yhat_upper"].to_numpy() - b["yhat_upper"].to_numpy()),
+        ]
+    )
+
+
+def comparar(prophet, datas, data_final, repeticoes=3):
+    """
+    Precisão e latência da inferência rápida contra o predict completo nas mesmas datas.
+    :return: Dicionário com os tempos (s) e as diferenças de yhat e dos limites.
+    """
+    futuro = pd.DataFrame({"ds": pd.to_datetime(datas)})
+
+    tempos_completo = []
+    execucoes = []
+    for _ in range(max(repeticoes, 2)):
+        inicio = time.perf_counter()
+        execucoes.append(prophet.predict(futuro))
+        tempos_completo.append(time.perf_counter() - inicio)
+    completo = execucoes[0]
+
+    inicio = time.perf_counter()
+    rapido = ProphetRapido.calibrar(prophet, data_final)
+    tempo_calibracao = time.perf_counter() - inicio
+
+    tempos_rapido = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        previsao = rapido.prever(futuro["ds"])
+        tempos_rapido.append(time.perf_counter() - inicio)
+
+    escala = float(np.mean(np.abs(completo["yhat"])))
+    diferenca = _diferenca_limites(previsao, completo)
+    # Referência: o quanto os limites do próprio predict completo variam entre duas execuções
+    ruido = _diferenca_limites(execucoes[1], completo)
+    return {
+        "linhas": len(futuro),
+        "tempo_completo": min(tempos_completo),
+        "tempo_calibracao": tempo_calibracao,
+        "tempo_rapido": min(tempos_rapido),
+        "diferenca_max_yhat": float(np.max(np.abs(previsao["yhat"].to_numpy() - completo["yhat"].to_numpy()))),
+        "diferenca_media_limites": float(np.mean(diferenca)) / escala,
+        "diferenca_max_limites": float(np.max(diferenca)) / escala,
+        "variacao_media_completo": float(np.mean(ruido)) / escala,
+        "variacao_max_completo": float(np.max(ruido)) / escala,
+    }
+
+
+def main():
+    from operacoes.carregar_modelo import carregar_modelos, ler_manifesto, CONFIG_PADRAO
+
+    parser = argparse.ArgumentParser(description="Compara a inferência rápida do Prophet com o predict completo.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    manifesto = ler_manifesto()
+    df, prophet, model_xgb, test, prophet_future = carregar_modelos()
+    data_final = manifesto["versoes"][manifesto["atual"]].get("config", CONFIG_PADRAO)["data_final"]
+
+    # Histórico inteiro mais o futuro até a data final, como no treino
+    datas = pd.date_range(prophet.history["ds"].min(), data_final, freq="D")
+    resultado = comparar(prophet, datas, data_final, args.repeticoes)
+
+    print(f"{resultado['linhas']} datas, melhor de {args.repeticoes} execuções")
+    print(f"predict completo   {resultado['tempo_completo'] * 1000:9.1f} ms")
+    print(
+        f"inferência rápida  {resultado['tempo_rapido'] * 1000:9.1f} ms "
+        f"({resultado['tempo_completo'] / resultado['tempo_rapido']:.0f}x), "
+        f"calibração única dos intervalos {resultado['tempo_calibracao'] * 1000:.1f} ms"
+    )
+    print(f"diferença máxima no yhat: {resultado['diferenca_max_yhat']:.2e} US$")
+    print(
+        f"diferença nos limites do intervalo (relativa ao preço médio): média "
+        f"{resultado['diferenca_media_limites']:.2%}, máxima {resultado['diferenca_max_limites']:.2%}"
+    )
+    print(
+        f"variação do próprio predict completo entre duas execuções: média "
+        f"{resultado['variacao_media_completo']:.2%}, máxima {resultado['variacao_max_completo']:.2%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Registro das versões treinadas: diretórios em modelo/versoes/ e o manifesto com a versão atual.
+
+Cada publicação usa um diretório novo (<versao>/ ou, se a versão for treinada de novo, <versao>-<sufixo>/),
+registrado em "diretorio" nos metadados da versão. A troca de versão é só a gravação atômica do manifesto:
+um diretório em uso nunca é substituído, e os substituídos são removidos depois de ESPERA_REMOCAO.
+
+Só depende da biblioteca padrão (e de operacoes.gravacao), para que quem apenas lê artefatos (o pacote de inferência, os
+processos de previsão) não precise importar o código de treino.
+"""
+import json
+import os
+import shutil
+import time
+import uuid
+from operacoes.gravacao import arquivo_atomico, trava_arquivo
+
+# Diretório dos artefatos versionados gerados pelo treino offline (python -m operacoes.treinar)
+MODELO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "modelo"))
+VERSOES_DIR = os.path.join(MODELO_DIR, "versoes")
+CAMINHO_MANIFESTO = os.path.join(MODELO_DIR, "manifesto.json")
+# Trava entre processos do treino: só um processo por vez ajusta modelos e publica versões
+CAMINHO_TRAVA_TREINO = os.path.join(MODELO_DIR, ".treino.lock")
+# Tempo para quem leu o manifesto antigo terminar de ler um diretório substituído antes de removê-lo
+ESPERA_REMOCAO = 10 * 60
+
+
+def ler_manifesto():
+    try:
+        with open(CAMINHO_MANIFESTO, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"atual": None, "versoes": {}}
+
+
+def diretorio_versao(versao=None, manifesto=None):
+    """
+    Diretório dos artefatos da versão informada ou da versão atual do manifesto.
+    :param manifesto: Manifesto já lido, para que a versão e o seu diretório venham da mesma leitura.
+    """
+    manifesto = manifesto or ler_manifesto()
+    if versao is None:
+        versao = manifesto["atual"]
+    if versao is None:
+        raise FileNotFoundError(
+            "Nenhum modelo treinado encontrado em modelo/. Execute: python -m operacoes.treinar"
+        )
+    # Versões publicadas antes do campo "diretorio" ficam em modelo/versoes/<versao>/
+    return os.path.join(VERSOES_DIR, manifesto["versoes"].get(versao, {}).get("diretorio", versao))
+
+
+def buscar_versao(versao):
+    """Metadados da versão se os seus artefatos já existem em modelo/, senão None."""
+    manifesto = ler_manifesto()
+    metadados = manifesto["versoes"].get(versao)
+    if metadados is None or not os.path.isdir(diretorio_versao(versao, manifesto)):
+        return None
+    return metadados
+
+
+def novo_diretorio(versao):
+    """Diretório ainda não usado para publicar a versão (nunca o de uma publicação anterior)."""
+    diretorio = os.path.join(VERSOES_DIR, versao)
+    if os.path.exists(diretorio):
+        diretorio = os.path.join(VERSOES_DIR, f"{versao}-{uuid.uuid4().hex[:8]}")
+    return diretorio
+
+
+def registrar_versao(versao, diretorio, metadados):
+    """
+    Registra o diretório já publicado como o da versão e a torna a atual, em uma única gravação atômica
+    do manifesto. O diretório anterior da mesma versão fica em "substituidos" até remover_substituidos.
+    Deve ser chamada sob a trava do treino.
+    """
+    manifesto = ler_manifesto()
+    nome = os.path.basename(diretorio)
+    anterior = manifesto["versoes"].get(versao)
+    if anterior is not None and anterior.get("diretorio", versao) != nome:
+        manifesto.setdefault("substituidos", {})[anterior.get("diretorio", versao)] = time.time()
+    manifesto["versoes"][versao] = {**metadados, "diretorio": nome}
+    manifesto["atual"] = versao
+    salvar_manifesto(manifesto)
+    remover_substituidos()
+
+
+def remover_substituidos(espera=ESPERA_REMOCAO):
+    """Remove os diretórios substituídos há mais de `espera` segundos (sob a trava do treino)."""
+    manifesto = ler_manifesto()
+    substituidos = manifesto.get("substituidos", {})
+    vencidos = [nome for nome, quando in substituidos.items() if time.time() - quando >= espera]
+    if not vencidos:
+        return
+    for nome in vencidos:
+        shutil.rmtree(os.path.join(VERSOES_DIR, nome), ignore_errors=True)
+        del substituidos[nome]
+    salvar_manifesto(manifesto)
+
+
+def definir_versao_atual(versao):
+    manifesto = ler_manifesto()
+    manifesto["atual"] = versao
+    salvar_manifesto(manifesto)
+
+
+def salvar_manifesto(manifesto):
+    with arquivo_atomico(CAMINHO_MANIFESTO, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, indent=2, ensure_ascii=False)
+
+
+def trava_treino():
+    """Trava exclusiva do treino, compartilhada por todos os processos que usam este modelo/."""
+    return trava_arquivo(CAMINHO_TRAVA_TREINO, "⏳ Outro processo está treinando; aguardando a conclusão...")
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import streamlit as st
+from operacoes.armazenamento import CAMINHO_PARQUET, ler_dados
+from operacoes.carregar_tabela import atualizar_base_dados
+
+# Tempo (em segundos) que os dados podem ficar sem nova consulta ao IPEA
+TTL_PADRAO = int(os.environ.get("IPEA_TTL_SEGUNDOS", 6 * 60 * 60))
+
+# Espera (em segundos) antes de tentar de novo depois de uma busca que falhou; dobra a cada falha
+ESPERA_APOS_ERRO = int(os.environ.get("IPEA_ESPERA_APOS_ERRO_SEGUNDOS", 5 * 60))
+
+
+class ServicoDados:
+    """
+    Serviço de dados do processo (stale-while-revalidate).
+    Devolve sempre o último conjunto de dados válido sem esperar pelo IPEA; quando os dados passam
+    do TTL, uma thread em segundo plano busca a série e troca o DataFrame de uma só vez.
+    A busca nunca roda sob a trava, e só uma acontece por vez: sem cópia local, as sessões que
+    chegam durante a primeira busca esperam por ela em vez de repeti-la. Depois de uma falha, a
+    próxima tentativa espera ESPERA_APOS_ERRO segundos, dobrando a cada nova falha (até o TTL).
+    """
+
+    def __init__(self, atualizar=atualizar_base_dados, ttl=TTL_PADRAO, espera_apos_erro=ESPERA_APOS_ERRO):
+        self._atualizar = atualizar
+        self.ttl = ttl
+        self.espera_apos_erro = espera_apos_erro
+        self._trava = threading.Lock()
+        self._df = None
+        self._atualizado_em = None
+        self._thread = None
+        self._busca = None  # threading.Event da busca em andamento (sinalizado ao terminar)
+        self._ultima_tentativa = None
+        self._falhas = 0
+        self.ultimo_erro = None
+
+    def obter(self):
+        """Retorna o DataFrame atual (ou None se não houver dados) e dispara a revalidação se preciso."""
+        with self._trava:
+            if self._df is None:
+                self._carregar_local()
+
+            if self._df is not None:
+                if self.idade() > self.ttl and self._pode_tentar():
+                    busca = self._iniciar_busca()
+                    self._thread = threading.Thread(target=self._buscar, args=(busca,), daemon=True)
+                    self._thread.start()
+                return self._df
+
+            # Sem nenhuma cópia local: a primeira carga precisa esperar pelo IPEA
+            if self._busca is not None:
+                busca, lider = self._busca, False
+            elif self._pode_tentar():
+                busca, lider = self._iniciar_busca(), True
+            else:
+                return None  # última tentativa falhou há pouco
+
+        if lider:
+            self._buscar(busca)
+        else:
+            busca.wait()
+        return self._df
+
+    def idade(self):
+        """Segundos desde a última atualização bem-sucedida dos dados."""
+        if self._atualizado_em is None:
+            return float("inf")
+        return time.time() - self._atualizado_em
+
+    @property
+    def atualizando(self):
+        return self._busca is not None
+
+    def _pode_tentar(self):
+        """Nenhuma busca em andamento e, depois de falhas, a espera já passou (chamado sob a trava)."""
+        if self._busca is not None:
+            return False
+        if self._falhas == 0 or self._ultima_tentativa is None:
+            return True
+        espera = min(self.espera_apos_erro * 2 ** (self._falhas - 1), self.ttl)
+        return time.time() - self._ultima_tentativa >= espera
+
+    def _iniciar_busca(self):
+        # Chamado sob a trava
+        self._busca = threading.Event()
+        self._ultima_tentativa = time.time()
+        return self._busca
+
+    def _carregar_local(self):
+        try:
+            self._df = ler_dados()
+        except FileNotFoundError:
+            return
+        self._atualizado_em = os.path.getmtime(CAMINHO_PARQUET)
+
+    def _buscar(self, busca):
+        # A busca roda fora da trava; apenas a troca do DataFrame é feita sob ela
+        try:
+            df = self._atualizar()
+        except Exception as e:
+            with self._trava:
+                self.ultimo_erro = e
+                self._falhas += 1
+                self._busca = None
+            busca.set()
+            return
+
+        with self._trava:
+            self._df = df
+            self._atualizado_em = time.time()
+            self.ultimo_erro = None
+            self._falhas = 0
+            self._busca = None
+        busca.set()
+
+
+_servico = None
+_trava_servico = threading.Lock()
+
+
+def obter_servico_dados():
+    """Instância única do serviço, compartilhada por todas as sessões do servidor."""
+    global _servico
+    with _trava_servico:
+        if _servico is None:
+            _servico = ServicoDados()
+        return _servico
+
+
+def formatar_idade(segundos):
+    if segundos < 60:
+        return "menos de 1 minuto"
+    if segundos < 60 * 60:
+        return f"{int(segundos // 60)} min"
+    if segundos < 48 * 60 * 60:
+        return f"{int(segundos // 3600)} h"
+    return f"{int(segundos // 86400)} dias"
+
+
+def mostrar_status_dados(servico=None):
+    """Indicador na barra lateral com a idade dos dados e o estado da atualização."""
+    servico = servico or obter_servico_dados()
+
+    if servico.idade() == float("inf"):
+        st.sidebar.caption("🕒 Dados ainda não carregados")
+    else:
+        st.sidebar.caption(f"🕒 Dados atualizados há {formatar_idade(servico.idade())}")
+
+    if servico.atualizando:
+        st.sidebar.caption("🔄 Atualizando dados do IPEA em segundo plano...")
+    elif servico.ultimo_erro is not None:
+        st.sidebar.caption(f"⚠️ Última atualização falhou: {servico.ultimo_erro}")
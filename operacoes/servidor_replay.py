@@ -0,0 +1,148 @@
+"""
+Servidor local que grava e reproduz as páginas ExibeSerie do IPEA, para testar e medir a
+ingestão sem rede e de forma determinística.
+
+Uso:
+    python -m operacoes.servidor_replay gravar 1650971490        # grava a página real em dados/replay/
+    python -m operacoes.servidor_replay servir --porta 8765 --falhas 2 --latencia 0.2
+    IPEA_URL_BASE=http://127.0.0.1:8765 streamlit run app_main.py
+"""
+import argparse
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from operacoes.armazenamento import DIRETORIO_DADOS
+
+DIRETORIO_REPLAY = os.path.join(DIRETORIO_DADOS, "replay")
+
+
+def caminho_gravacao(serid, diretorio=DIRETORIO_REPLAY):
+    return os.path.join(diretorio, f"{serid}.html")
+
+
+def gravar(serids, diretorio=DIRETORIO_REPLAY):
+    from operacoes.cliente_ipea import URL_IPEA_OFICIAL, ClienteIpea
+
+    cliente = ClienteIpea(url_base=URL_IPEA_OFICIAL)  # sempre contra o IPEA real
+    os.makedirs(diretorio, exist_ok=True)
+    for serid in serids:
+        conteudo = cliente.buscar_serie(serid, condicional=False)
+        with open(caminho_gravacao(serid, diretorio), "wb") as arquivo:
+            arquivo.write(conteudo)
+        print(f"✅ Série {serid} gravada ({len(conteudo) / 1024:.0f} KiB)")
+
+
+def criar_handler(diretorio, latencia=0.0, falhas=0):
+    # Contador de requisições por série, para falhar de forma determinística as primeiras `falhas`
+    contagem = {}
+    trava = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, formato, *args):
+            pass
+
+        def _responder(self, status, corpo=b"", headers=None):
+            self.send_response(status)
+            for nome, valor in (headers or {}).items():
+                self.send_header(nome, valor)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            if corpo:
+                self.wfile.write(corpo)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            serid = parse_qs(url.query).get("serid", [None])[0]
+            if url.path != "/ExibeSerie.aspx" or serid is None:
+                self._responder(404)
+                return
+
+            with trava:
+                contagem[serid] = contagem.get(serid, 0) + 1
+                numero = contagem[serid]
+
+            if latencia:
+                time.sleep(latencia)
+            if numero <= falhas:
+                self._responder(503, headers={"Retry-After": "0"})
+                return
+
+            caminho = caminho_gravacao(serid, diretorio)
+            if not os.path.exists(caminho):
+                self._responder(404)
+                return
+
+            with open(caminho, "rb") as arquivo:
+                corpo = arquivo.read()
+            etag = '"' + hashlib.sha256(corpo).hexdigest()[:32] + '"'
+            modificado = os.path.getmtime(caminho)
+            headers = {
+                "Content-Type": "text/html; charset=utf-8",
+                "ETag": etag,
+                "Last-Modified": formatdate(modificado, usegmt=True),
+            }
+
+            if self.headers.get("If-None-Match") == etag:
+                self._responder(304, headers=headers)
+                return
+            desde = self.headers.get("If-Modified-Since")
+            if desde and "If-None-Match" not in self.headers:
+                try:
+                    if int(modificado) <= parsedate_to_datetime(desde).timestamp():
+                        self._responder(304, headers=headers)
+                        return
+                except (TypeError, ValueError):
+                    pass
+
+            self._responder(200, corpo, headers)
+
+    return ReplayHandler
+
+
+def iniciar_servidor(diretorio=DIRETORIO_REPLAY, porta=0, latencia=0.0, falhas=0):
+    """
+    Sobe o servidor em uma thread e retorna (servidor, url_base).
+    Com porta=0 o sistema escolhe uma porta livre.
+    """
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), criar_handler(diretorio, latencia, falhas))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gravação e replay local das páginas do IPEA.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_gravar = sub.add_parser("gravar", help="Grava as páginas reais das séries informadas.")
+    p_gravar.add_argument("serids", nargs="+")
+    p_gravar.add_argument("--diretorio", default=DIRETORIO_REPLAY)
+
+    p_servir = sub.add_parser("servir", help="Serve as páginas gravadas.")
+    p_servir.add_argument("--diretorio", default=DIRETORIO_REPLAY)
+    p_servir.add_argument("--porta", type=int, default=8765)
+    p_servir.add_argument("--latencia", type=float, default=0.0, help="Atraso (s) em cada resposta.")
+    p_servir.add_argument("--falhas", type=int, default=0, help="Responde 503 às primeiras N requisições de cada série.")
+
+    args = parser.parse_args()
+
+    if args.comando == "gravar":
+        gravar(args.serids, args.diretorio)
+        return
+
+    servidor, url_base = iniciar_servidor(args.diretorio, args.porta, args.latencia, args.falhas)
+    print(f"🔁 Replay do IPEA em {url_base} (IPEA_URL_BASE={url_base})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
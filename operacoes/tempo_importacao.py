@@ -0,0 +1,127 @@
+"""
+Relatório do custo da primeira abertura de cada página do dashboard.
+
+Duas medidas por página, cada uma em um interpretador novo (como no primeiro acesso a um worker
+recém-iniciado):
+- importação: só o `import` do módulo da página, depois do Streamlit (que todo worker já carrega).
+  O tempo de cada biblioteca vem de `python -X importtime`: soma do tempo próprio de todos os
+  módulos do pacote importados pela página.
+- 1ª abertura: o app é executado uma vez (menu e página inicial) pelo AppTest do Streamlit e então a
+  página é aberta no menu; conta a importação e a renderização (leitura dos dados e dos artefatos,
+  gráficos), com os caches do processo vazios. Precisa da base em dados/ e de um modelo treinado, e
+  usa o diretório atual como o `streamlit run`. Na página inicial, é a primeira execução do app.
+
+Uso:
+    python -m operacoes.tempo_importacao
+    python -m operacoes.tempo_importacao --pacotes 8
+    python -m operacoes.tempo_importacao --sem-abrir     # só a importação (sem dados nem modelo)
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# Importados em todo acesso, qualquer que seja a página (menu e barra lateral do app_main)
+SEMPRE = "operacoes.servico_dados"
+
+# Executa o app uma vez e depois abre a página pelo menu, medindo as duas execuções do script
+_CODIGO_ABERTURA = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+inicio = time.perf_counter()
+app.run()
+inicial = time.perf_counter() - inicio
+inicio = time.perf_counter()
+app.sidebar.selectbox[0].select(sys.argv[2]).run()
+pagina = time.perf_counter() - inicio
+erros = [str(e.value) for e in app.exception] + [str(e.value) for e in app.error]
+print(json.dumps({"inicial": inicial, "pagina": pagina, "erros": erros}))
+"""
+
+
+def _importar(modulo, antes="streamlit"):
+    """Importa o módulo em um processo novo (depois de `antes`) e retorna (segundos, linhas do -X importtime)."""
+    codigo = (
+        f"import time{', ' + antes if antes else ''}; inicio = time.perf_counter(); "
+        f"import {modulo}; print(time.perf_counter() - inicio)"
+    )
+    resultado = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo], capture_output=True, text=True, cwd=RAIZ, check=True
+    )
+    return float(resultado.stdout.strip().splitlines()[-1]), resultado.stderr.splitlines()
+
+
+def medir_pagina(modulo, antes="streamlit"):
+    """
+    :return: (segundos para importar o módulo, {pacote: segundos}), sem contar o que `antes` já importou.
+    """
+    segundos, linhas = _importar(modulo, antes)
+
+    # Só o que foi importado depois de `antes` (a última linha dele, sem recuo, fecha a sua árvore)
+    inicio = -1
+    if antes:
+        inicio = max(i for i, linha in enumerate(linhas) if linha.rstrip().endswith(f"| {antes}"))
+    pacotes = defaultdict(float)
+    for linha in linhas[inicio + 1 :]:
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, _, nome = linha[len("import time:") :].split("|")
+        pacotes[nome.strip().split(".")[0]] += int(proprio) / 1e6
+    return segundos, dict(pacotes)
+
+
+def medir_abertura(nome):
+    """
+    Abre o app e depois a página em um processo novo (ver _CODIGO_ABERTURA).
+    :return: {"inicial": segundos da 1ª execução do app, "pagina": segundos da página, "erros": [...]}.
+    """
+    resultado = subprocess.run(
+        [sys.executable, "-c", _CODIGO_ABERTURA, os.path.join(RAIZ, "app_main.py"), nome],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))},
+        check=True,
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from operacoes.paginas import PAGINAS
+
+    parser = argparse.ArgumentParser(description="Custo da primeira abertura de cada página do dashboard.")
+    parser.add_argument("--pacotes", type=int, default=5, help="Pacotes mais caros listados por página.")
+    parser.add_argument("--sem-abrir", action="store_true", help="Mede só a importação (não renderiza as páginas).")
+    args = parser.parse_args()
+
+    def linha(nome, segundos, pacotes, abertura=None):
+        mais_caros = sorted(pacotes.items(), key=lambda item: item[1], reverse=True)[: args.pacotes]
+        aberta = "" if abertura is None else f"{abertura * 1000:.0f} ms"
+        print(
+            f"{nome:<28} {segundos * 1000:8.0f} ms {aberta:>11}   "
+            + ", ".join(f"{p} {s * 1000:.0f} ms" for p, s in mais_caros)
+        )
+
+    print("Processo novo por medida; a importação conta só o que a página importa além do Streamlit")
+    print(f"{'':<28} {'importação':>11} {'1ª abertura':>11}   pacotes mais caros na importação")
+    linha("Streamlit", *medir_pagina("streamlit", antes=None))
+    linha("Menu e barra lateral", *medir_pagina(SEMPRE))
+    inicial = next(iter(PAGINAS))
+    for nome, (modulo, _) in PAGINAS.items():
+        abertura = None
+        if not args.sem_abrir:
+            medida = medir_abertura(nome)
+            if medida["erros"]:
+                print(f"⚠️ {nome}: {medida['erros']}")
+            # A página inicial é aberta pela própria execução do app (com o menu)
+            abertura = medida["inicial"] if nome == inicial else medida["pagina"]
+        linha(nome, *medir_pagina(modulo), abertura)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Treino offline dos modelos Prophet + XGBoost.
+
+Uso:
+    python -m operacoes.treinar                   # treina com a base local em dados/
+    python -m operacoes.treinar --atualizar-dados # atualiza a série do IPEA antes de treinar
+    python -m operacoes.treinar --validar-warm-start  # compara o warm start com um ajuste do zero
+    python -m operacoes.treinar --forcar --formato-prophet pickle  # Prophet em pickle (carrega mais rápido)
+    python -m operacoes.treinar --series 1650971490 "<serid>:WTI (US$):2010-01-01"
+                                                  # também ingere outras séries do IPEA (dados/series_ipea.parquet)
+
+Os artefatos são gravados em um diretório novo de modelo/versoes/ e o dashboard apenas os carrega.
+A versão é o hash da série de entrada mais a configuração de treino: se nada mudou, o treino
+é pulado e a versão existente é reaproveitada (use --forcar para treinar mesmo assim).
+Quando os dados apenas cresceram, o Prophet parte dos parâmetros da versão anterior (warm start).
+Os hiperparâmetros vêm de modelo/config_treino.json quando existir (gerado por operacoes.busca_xgb).
+Treinos simultâneos (vários processos no mesmo volume) são serializados por uma trava em
+modelo/.treino.lock, e cada artefato é gravado em um temporário e renomeado: quem lê nunca vê um
+arquivo pela metade.
+"""
+import argparse
+import time
+from operacoes.armazenamento import ler_dados, versao_dados
+from operacoes.carregar_tabela import atualizar_base_dados, atualizar_series
+from operacoes.carregar_modelo import (
+    ajustar_prophet,
+    avaliar_modelos,
+    carregar_config,
+    carregar_prophet_anterior,
+    chave_versao,
+    comparar_prophets,
+    preparar_dados,
+    salvar_artefatos,
+    treinar_modelos,
+)
+from operacoes.registro import buscar_versao, definir_versao_atual, trava_treino
+
+# Piora máxima aceita no RMSE do histórico do warm start em relação ao ajuste do zero
+TOLERANCIA_WARM_START = 0.01
+
+
+def carregar_dados_treino(atualizar=False):
+    if atualizar:
+        return atualizar_base_dados()
+    try:
+        # Tenta carregar os dados do armazenamento local (Parquet tipado)
+        return ler_dados()
+    except FileNotFoundError:
+        print("⚠️ Base local não encontrada. Carregando da base de dados online...")
+        return atualizar_base_dados()
+
+
+def ajustar_prophet_incremental(df, config, prophet_anterior, validar=False, tolerancia=TOLERANCIA_WARM_START):
+    """Ajusta o Prophet com warm start e, se pedido, confere o resultado contra um ajuste do zero."""
+    df_prophet = preparar_dados(df)
+
+    inicio = time.perf_counter()
+    prophet = ajustar_prophet(df_prophet, config, prophet_anterior)
+    duracao_quente = time.perf_counter() - inicio
+    print(f"🔥 Prophet com warm start ajustado em {duracao_quente:.1f} s")
+
+    if not validar:
+        return prophet
+
+    inicio = time.perf_counter()
+    prophet_frio = ajustar_prophet(df_prophet, config)
+    duracao_frio = time.perf_counter() - inicio
+    comparacao = comparar_prophets(prophet, prophet_frio, df_prophet)
+    print(
+        f"🧊 Ajuste do zero em {duracao_frio:.1f} s ({duracao_frio / duracao_quente:.1f}x mais lento); "
+        f"RMSE no histórico: warm start {comparacao['rmse_quente']:.4f}, do zero {comparacao['rmse_frio']:.4f}; "
+        f"diferença máxima no yhat: {comparacao['diferenca_max_yhat']:.2%}"
+    )
+
+    # O Stan pode parar em ótimos locais diferentes; o que importa é o warm start ajustar tão bem quanto
+    if comparacao["rmse_quente"] > comparacao["rmse_frio"] * (1 + tolerancia):
+        print("⚠️ Warm start fora da tolerância; usando o ajuste do zero.")
+        return prophet_frio
+    return prophet
+
+
+def treinar(
+    atualizar=False, config=None, forcar=False, warm_start=True, validar_warm_start=False, formato_prophet="json"
+):
+    """
+    :param config: Configuração de treino; por padrão a de carregar_config() (padrão + modelo/config_treino.json).
+    :param formato_prophet: Formato do arquivo do Prophet, "json" ou "pickle" (ver salvar_artefatos).
+    """
+    # Um treino por vez entre todos os processos: quem espera a trava, ao entrar, encontra a versão
+    # que o outro processo acabou de publicar e a reaproveita em vez de ajustar os modelos de novo
+    with trava_treino():
+        config = config or carregar_config()
+        df = carregar_dados_treino(atualizar)
+
+        hash_dados = versao_dados(df)
+        versao = chave_versao(hash_dados, config)
+
+        # Mesmos dados e mesma configuração: reaproveita os artefatos já treinados
+        if not forcar and buscar_versao(versao) is not None:
+            definir_versao_atual(versao)
+            print(f"♻️ Dados e configuração inalterados; reaproveitando a versão {versao}")
+            return versao
+
+        inicio = time.perf_counter()
+        prophet = None
+        prophet_anterior = carregar_prophet_anterior(config) if warm_start else None
+        if prophet_anterior is not None:
+            prophet = ajustar_prophet_incremental(df, config, prophet_anterior, validar=validar_warm_start)
+
+        df_resultado, prophet, model_xgb, test, prophet_future = treinar_modelos(df, config, prophet=prophet)
+        duracao = time.perf_counter() - inicio
+        print(f"⏱️ Treino concluído em {duracao:.1f} s")
+
+        metricas = avaliar_modelos(model_xgb, test, config)
+        print("📏 Teste: " + ", ".join(f"{nome.upper()} {valor:.2f}" for nome, valor in metricas.items()))
+
+        metadados = {
+            "hash_dados": hash_dados,
+            "config": config,
+            "metricas_teste": metricas,
+            "duracao_treino_s": round(duracao, 1),
+            "warm_start": prophet_anterior is not None,
+        }
+        return salvar_artefatos(
+            versao, df_resultado, prophet, model_xgb, test, prophet_future, metadados, formato_prophet
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina os modelos e grava os artefatos em modelo/.")
+    parser.add_argument("--atualizar-dados", action="store_true", help="Atualiza a série do IPEA antes do treino.")
+    parser.add_argument("--forcar", action="store_true", help="Treina mesmo se a versão já existir.")
+    parser.add_argument("--sem-warm-start", action="store_true", help="Ajusta o Prophet do zero.")
+    parser.add_argument(
+        "--validar-warm-start", action="store_true", help="Confere o warm start contra um ajuste do zero."
+    )
+    parser.add_argument(
+        "--formato-prophet",
+        choices=["json", "pickle"],
+        default="json",
+        help="Formato do Prophet: json (padrão, independe das classes do Prophet) ou pickle (carrega mais rápido).",
+    )
+    parser.add_argument(
+        "--series",
+        nargs="+",
+        metavar="SERID[:COLUNA[:INICIO[:FIM]]]",
+        help="Ingere também estas séries do IPEA, alinhadas por data em dados/series_ipea.parquet "
+        "(coluna padrão: o serid; período padrão: o completo).",
+    )
+    args = parser.parse_args()
+
+    if args.series:
+        series = atualizar_series(args.series)
+        print(f"📥 {len(series.columns) - 1} séries do IPEA alinhadas em {len(series)} datas")
+
+    versao = treinar(
+        atualizar=args.atualizar_dados,
+        forcar=args.forcar,
+        warm_start=not args.sem_warm_start,
+        validar_warm_start=args.validar_warm_start,
+        formato_prophet=args.formato_prophet,
+    )
+    print(f"✅ Versão atual dos modelos: {versao}")
+
+
+if __name__ == "__main__":
+    main()